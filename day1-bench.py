@@ -0,0 +1,69 @@
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+import day1
+
+
+def create_calorie_log(file_name, elves, seed=1):
+    # write a synthetic calorie log with a random number of items per elf
+    rnd = random.Random(seed)
+
+    with open(file_name, "w") as f:
+        for elf in range(0, elves):
+            if elf > 0:
+                f.write("\n")
+
+            for item in range(0, rnd.randint(1, 15)):
+                f.write(f"{rnd.randint(1000, 70000)}\n")
+
+
+def bench(name, func, repeat):
+    # returns (result, best time in seconds)
+    seconds = min(timeit.repeat(func, number=1, repeat=repeat))
+    print(f"{name:<20} {seconds * 1000:10.2f} ms")
+
+    return func(), seconds
+
+
+def main():
+    elves = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    repeat = 3
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_name = os.path.join(temp_dir, "day1-bench.txt")
+        create_calorie_log(file_name, elves)
+
+        print(f"Elves: {elves:,}, file size: {os.path.getsize(file_name):,} bytes")
+
+        workers = os.cpu_count() or 1
+
+        expected, sort_seconds = bench(
+            "sort", lambda: day1.sorted_top_k_calories(file_name, 3), repeat
+        )
+        result, streaming_seconds = bench(
+            "streaming heap", lambda: day1.top_k_calories(day1.read_elf_totals(file_name), 3), repeat
+        )
+
+        # a pool worker reads a byte range, over the whole file it should cost
+        # the same as the streaming path
+        file_size = os.path.getsize(file_name)
+        range_result, range_seconds = bench(
+            "one range worker", lambda: day1.top_k_calories(day1.read_elf_totals(file_name, 0, file_size), 3), repeat
+        )
+        parallel_result, parallel_seconds = bench(
+            "parallel", lambda: day1.parallel_top_k_calories(file_name, 3, workers=workers), repeat
+        )
+
+        print(f"range worker / streaming: {range_seconds / streaming_seconds:.2f}x")
+        print(f"parallel speedup over streaming with {workers} workers: {streaming_seconds / parallel_seconds:.2f}x")
+
+        for other in (result, range_result, parallel_result):
+            if other != expected:
+                raise AssertionError(f"Results differ: {other} != {expected}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import os
+import random
+import tempfile
+import unittest
+
+import day1
+
+SAMPLE_LOG = "1000\n2000\n3000\n\n4000\n\n5000\n6000\n\n7000\n8000\n9000\n\n10000\n"
+
+
+class Day1TestCase(unittest.TestCase):
+    def setUp(self):
+        fd, self.file_name = tempfile.mkstemp()
+
+        with os.fdopen(fd, "w") as f:
+            f.write(SAMPLE_LOG)
+
+    def tearDown(self):
+        os.remove(self.file_name)
+
+
+class ReadElfTotalsTestCase(Day1TestCase):
+    def test_read_elf_totals(self):
+        self.assertEqual(list(day1.read_elf_totals(self.file_name)), [6000, 4000, 11000, 24000, 10000])
+
+    def test_block_boundaries(self):
+        # small blocks split lines and blank line separators between reads
+        for block_size in range(1, 8):
+            self.assertEqual(
+                list(day1.read_elf_totals(self.file_name, block_size=block_size)),
+                [6000, 4000, 11000, 24000, 10000]
+            )
+
+            for start, end in day1.elf_chunk_ranges(self.file_name, 3):
+                self.assertEqual(
+                    list(day1.read_elf_totals(self.file_name, start, end, block_size)),
+                    list(day1.read_elf_totals(self.file_name, start, end))
+                )
+
+    def test_chunk_ranges(self):
+        # reading every range gives the same elves as reading the whole file
+        for chunks in range(1, 12):
+            ranges = day1.elf_chunk_ranges(self.file_name, chunks)
+            totals = [total for start, end in ranges for total in day1.read_elf_totals(self.file_name, start, end)]
+
+            self.assertEqual(totals, [6000, 4000, 11000, 24000, 10000], msg=f"{chunks} chunks")
+
+
+class TopKCaloriesTestCase(Day1TestCase):
+    def test_top_k_calories(self):
+        self.assertEqual(day1.top_k_calories(day1.read_elf_totals(self.file_name), 3), (24000, 45000))
+        self.assertEqual(day1.top_k_calories([5, 1], 3), (5, 6))
+
+        self.assertRaises(ValueError, lambda: day1.top_k_calories([], 3))
+        self.assertRaises(ValueError, lambda: day1.top_k_calories([1], 0))
+
+    def test_matches_sorted(self):
+        self.assertEqual(
+            day1.top_k_calories(day1.read_elf_totals(self.file_name), 3),
+            day1.sorted_top_k_calories(self.file_name, 3)
+        )
+
+    def test_parallel(self):
+        self.assertEqual(day1.parallel_top_k_calories(self.file_name, 3, workers=2, chunks=4), (24000, 45000))
+
+
+class ElfTotalsIndexTestCase(Day1TestCase):
+    @staticmethod
+    def brute_force_checks(test_case, index, totals):
+        ordered = sorted(totals, reverse=True)
+
+        for n in range(0, len(totals) + 2):
+            test_case.assertEqual(index.top_n(n), sum(ordered[:n]))
+
+        for elf_no, total in enumerate(totals):
+            test_case.assertEqual(index.rank(elf_no), 1 + len([item for item in totals if item > total]))
+
+        for threshold in range(-1, 52):
+            test_case.assertEqual(index.count_above(threshold), len([item for item in totals if item > threshold]))
+            test_case.assertEqual(index.sum_above(threshold), sum(item for item in totals if item > threshold))
+
+    def test_from_file(self):
+        index = day1.ElfTotalsIndex.from_file(self.file_name)
+
+        self.assertEqual(len(index), 5)
+        self.assertEqual(index.max(), 24000)
+        self.assertEqual(index.top_n(3), 45000)
+        self.assertEqual(index.rank(3), 1)
+        self.assertEqual(index.rank(1), 5)
+
+    def test_append_with_merges(self):
+        rnd = random.Random(3)
+
+        for merge_size in range(1, 6):
+            totals = [rnd.randint(0, 50) for elf in range(0, 10)]
+            index = day1.ElfTotalsIndex(totals, merge_size=merge_size)
+
+            # appends go through the pending run and several merges
+            for elf in range(0, 20):
+                total = rnd.randint(0, 50)
+                self.assertEqual(index.append(total), len(totals))
+                totals.append(total)
+
+                self.brute_force_checks(self, index, totals)
+
+    def test_large_top_n(self):
+        rnd = random.Random(4)
+        totals = [rnd.randint(-20, 200) for elf in range(0, 500)]
+        index = day1.ElfTotalsIndex(totals[:100], merge_size=16)
+
+        for total in totals[100:]:
+            index.append(total)
+
+        # above 256 the sum is found by searching for the n-th largest total
+        ordered = sorted(totals, reverse=True)
+
+        for n in range(250, 510, 7):
+            self.assertEqual(index.top_n(n), sum(ordered[:n]))
+
+        self.assertEqual(index.max(), ordered[0])
+
+    def test_invalid_queries(self):
+        self.assertRaises(ValueError, lambda: day1.ElfTotalsIndex([1, 2]).top_n(-1))
+        self.assertRaises(ValueError, lambda: day1.ElfTotalsIndex().max())
+        self.assertEqual(day1.ElfTotalsIndex().top_n(3), 0)
+
+    def test_save_load(self):
+        index = day1.ElfTotalsIndex([10, 30, 20], merge_size=4)
+        index.append(40)
+
+        index_file = self.file_name + ".index"
+        index.save(index_file)
+
+        try:
+            loaded = day1.ElfTotalsIndex.load(index_file)
+        finally:
+            os.remove(index_file)
+
+        self.brute_force_checks(self, loaded, [10, 30, 20, 40])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,17 +1,300 @@
-f = open("input-data/day1-input.txt", "r")
+import bisect
+import heapq
+import os
+import pickle
+import re
 
-data = f.read()
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
 
-elf_calorie_counts = data.split("\n\n")
-elf_calorie_counts = [tuple(map(int,item.split())) for item in elf_calorie_counts]
+INPUT_FILE = "input-data/day1-input.txt"
 
-elf_total_calories = list(map(sum, elf_calorie_counts))
 
-print("Part 1: {}".format(max(elf_total_calories)))
+def read_elf_totals(file_name, start=0, end=None, block_size=1 << 20):
+    # stream the calorie log in blocks, yielding each elf's total as soon as its
+    # blank line separator (or end of file) is reached. start and end limit
+    # reading to a byte range, which must be aligned to elf boundaries. a range
+    # is read with the same block loop, only the read sizes are capped
+    total = 0
+    has_items = False
+    remaining = None if end is None else end - start
+    remainder = b""
 
-elf_total_calories.sort(reverse=True)
+    with open(file_name, "rb") as f:
+        f.seek(start)
 
-top3 = elf_total_calories[:3]
+        while True:
+            block = f.read(block_size if remaining is None else min(block_size, remaining))
 
+            if remaining is not None:
+                remaining -= len(block)
 
-print("Part 2: {}".format(sum(top3)))
+            # hold back the partial last line until the next block
+            lines = (remainder + block).split(b"\n")
+            remainder = lines.pop() if block != b"" else b""
+
+            for line in lines:
+                line = line.strip()
+
+                if line == b"":
+                    if has_items:
+                        yield total
+
+                    total = 0
+                    has_items = False
+                else:
+                    total += int(line)
+                    has_items = True
+
+            if block == b"":
+                break
+
+    if has_items:
+        yield total
+
+
+def top_k_calories(elf_totals, k=3):
+    # keep a bounded min-heap of the k largest totals, memory is O(k) no matter
+    # how many elves there are. returns (max total, sum of top k totals)
+    if k < 1:
+        raise ValueError("k must be at least 1")
+
+    heap = []
+
+    for total in elf_totals:
+        if len(heap) < k:
+            heapq.heappush(heap, total)
+        elif total > heap[0]:
+            heapq.heapreplace(heap, total)
+
+    if len(heap) == 0:
+        raise ValueError("No elf totals found")
+
+    return max(heap), sum(heap)
+
+
+def elf_chunk_ranges(file_name, chunks):
+    # split the file into roughly equal byte ranges, moving each boundary
+    # forward to the start of the next elf so no elf is split between ranges
+    file_size = os.path.getsize(file_name)
+    separator = re.compile(rb"\n\r?\n")
+    block_size = 65536
+    boundaries = [0]
+
+    with open(file_name, "rb") as f:
+        for chunk in range(1, chunks):
+            offset = max(file_size * chunk // chunks - 1, boundaries[-1])
+            f.seek(offset)
+            buffer = b""
+            boundary = file_size
+
+            # read forward until a blank line is found
+            while True:
+                block = f.read(block_size)
+                buffer = buffer[-2:] + block
+
+                m = separator.search(buffer)
+                if m is not None:
+                    boundary = f.tell() - len(buffer) + m.end()
+                    break
+
+                if block == b"":
+                    break
+
+            if boundary > boundaries[-1]:
+                boundaries.append(boundary)
+
+            if boundary >= file_size:
+                break
+
+    if boundaries[-1] < file_size:
+        boundaries.append(file_size)
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _top_k_range(file_name, start, end, k):
+    # process pool worker, returns the local top k totals of a byte range
+    return heapq.nlargest(k, read_elf_totals(file_name, start, end))
+
+
+def parallel_top_k_calories(file_name, k=3, workers=None, chunks=None):
+    # process elf aligned byte ranges in a process pool and merge each range's
+    # local top k. returns (max total, sum of top k totals)
+    workers = workers or os.cpu_count() or 1
+    chunks = chunks or workers * 4
+    ranges = elf_chunk_ranges(file_name, chunks)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_top_k_range, file_name, start, end, k) for start, end in ranges
+        ]
+
+        local_top_k = [total for future in futures for total in future.result()]
+
+    return top_k_calories(local_top_k, k)
+
+
+class ElfTotalsIndex:
+    """ Rank index over elf totals.
+
+    Totals are held in sorted runs, each with prefix sums, so top-N sums, ranks
+    and threshold queries are answered with binary searches over every run.
+    Appended elves go into a small sorted pending run, whose prefix sums are
+    rebuilt on the next query rather than on every append. Once it grows past
+    merge_size it becomes a run and is merged with the runs no larger than it,
+    like a binary counter, so there are O(log n) runs, each total is merged
+    O(log n) times and appending never rebuilds the whole index.
+    """
+
+    @property
+    def elf_totals(self):
+        return self._totals
+
+    def __init__(self, elf_totals=(), merge_size=1024):
+        self._merge_size = merge_size
+        self._totals = array('q', elf_totals)
+        self._runs = []  # (ascending totals, prefix sums), largest run first
+
+        if len(self._totals) > 0:
+            self._runs.append(self._make_run(sorted(self._totals)))
+
+        self._pending = array('q')
+        self._pending_prefix = array('q', [0])
+
+    def __len__(self):
+        return len(self._totals)
+
+    @staticmethod
+    def _make_run(values):
+        values = array('q', values)
+        return values, array('q', accumulate(values, initial=0))
+
+    @classmethod
+    def from_file(cls, file_name, merge_size=1024):
+        return cls(read_elf_totals(file_name), merge_size)
+
+    @classmethod
+    def load(cls, file_name):
+        with open(file_name, "rb") as f:
+            index = pickle.load(f)
+
+        if not isinstance(index, cls):
+            raise TypeError(f"Expecting {cls} in {file_name}, got {type(index)}")
+
+        return index
+
+    def save(self, file_name):
+        with open(file_name, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def append(self, total):
+        # add a new elf, returns its elf number
+        self._totals.append(total)
+
+        pos = bisect.bisect_left(self._pending, total)
+        self._pending.insert(pos, total)
+
+        # the pending prefix sums are only rebuilt when a query needs them
+        self._pending_prefix = None
+
+        if len(self._pending) > self._merge_size:
+            self._merge_pending()
+
+        return len(self._totals) - 1
+
+    def _merge_pending(self):
+        run = self._pending
+
+        while self._runs and len(self._runs[-1][0]) <= len(run):
+            run = array('q', sorted(self._runs.pop()[0] + run))
+
+        self._runs.append(self._make_run(run))
+        self._pending = array('q')
+        self._pending_prefix = array('q', [0])
+
+    def _all_runs(self):
+        if self._pending_prefix is None:
+            self._pending_prefix = array('q', accumulate(self._pending, initial=0))
+
+        return self._runs + [(self._pending, self._pending_prefix)]
+
+    def _count_above(self, threshold):
+        return sum(len(values) - bisect.bisect_right(values, threshold) for values, prefix in self._all_runs())
+
+    def top_n(self, n):
+        # sum of the n largest totals. for larger n the n-th largest total is
+        # found with a binary search over the values, counting the totals above
+        # each guess
+        if n < 0:
+            raise ValueError("n must not be negative")
+
+        n = min(n, len(self))
+
+        if n == 0:
+            return 0
+
+        runs = [values for values, prefix in self._all_runs() if len(values) > 0]
+
+        # for small n the n largest are among the last n totals of each run
+        if n <= 256:
+            return sum(heapq.nlargest(n, (total for values in runs for total in values[-n:])))
+
+        low, high = min(values[0] for values in runs), max(values[-1] for values in runs)
+
+        while low < high:
+            guess = (low + high) // 2
+
+            if self._count_above(guess) < n:
+                high = guess
+            else:
+                low = guess + 1
+
+        # low is the n-th largest, ties with it make up the rest of the n
+        return self.sum_above(low) + (n - self._count_above(low)) * low
+
+    def max(self):
+        if len(self) == 0:
+            raise ValueError("No elf totals found")
+
+        return max(values[-1] for values, prefix in self._all_runs() if len(values) > 0)
+
+    def rank(self, elf_no):
+        # 1 based rank of an elf, elves with equal totals share a rank
+        return self._count_above(self._totals[elf_no]) + 1
+
+    def count_above(self, threshold):
+        # number of elves carrying more than threshold calories
+        return self._count_above(threshold)
+
+    def sum_above(self, threshold):
+        # total calories of elves carrying more than threshold calories
+        return sum(
+            prefix[-1] - prefix[bisect.bisect_right(values, threshold)] for values, prefix in self._all_runs()
+        )
+
+
+def sorted_top_k_calories(file_name, k=3):
+    # original implementation: read everything, split into elves and sort
+    with open(file_name, "r") as f:
+        data = f.read()
+
+    elf_calorie_counts = data.split("\n\n")
+    elf_calorie_counts = [tuple(map(int, item.split())) for item in elf_calorie_counts]
+
+    elf_total_calories = list(map(sum, elf_calorie_counts))
+    elf_total_calories.sort(reverse=True)
+
+    return elf_total_calories[0], sum(elf_total_calories[:k])
+
+
+def main():
+    max_calories, top3 = top_k_calories(read_elf_totals(INPUT_FILE), 3)
+
+    print("Part 1: {}".format(max_calories))
+    print("Part 2: {}".format(top3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+
+import day2
+
+SAMPLE_GUIDE = "A Y\nB X\nC Z\n"
+
+
+class Day2TestCase(unittest.TestCase):
+    def setUp(self):
+        fd, self.file_name = tempfile.mkstemp()
+
+        with os.fdopen(fd, "w") as f:
+            f.write(SAMPLE_GUIDE)
+
+    def tearDown(self):
+        os.remove(self.file_name)
+
+    def write(self, data):
+        with open(self.file_name, "w") as f:
+            f.write(data)
+
+
+class CountRoundsTestCase(Day2TestCase):
+    def test_count_rounds(self):
+        self.write("A Y\nB X\n\nA Y\r\nC Z")
+
+        self.assertEqual(day2.count_rounds(self.file_name), {"A Y": 2, "B X": 1, "C Z": 1})
+
+    def test_invalid_round(self):
+        self.write("A Y\nD X\n")
+
+        with self.assertRaises(ValueError) as cm:
+            day2.count_rounds(self.file_name)
+
+        self.assertEqual(str(cm.exception), "Invalid round: D X")
+
+
+class ScoreTableTestCase(Day2TestCase):
+    def test_score_tables(self):
+        self.assertEqual(len(day2.score_table_part1), 9)
+        self.assertEqual(day2.score_table_part1["A Y"], 8)
+        self.assertEqual(day2.score_table_part2["A Y"], 4)
+
+        # every table entry matches scoring the round directly
+        for round_key, score in day2.score_table_part1.items():
+            opponent_move = day2.mapping[round_key[0]]
+            self.assertEqual(score, day2.get_score(opponent_move + day2.strategy_part1[round_key[2]]))
+
+    def test_invalid_strategy(self):
+        self.assertRaises(ValueError, lambda: day2.build_score_table({"X": "R", "Y": "P", "Z": "Q"}))
+
+
+class ScoreStrategiesTestCase(Day2TestCase):
+    def test_sample(self):
+        self.assertEqual(
+            day2.score_strategies(self.file_name, [day2.strategy_part1, day2.strategy_part2]),
+            [15, 12]
+        )
+
+    def test_custom_strategies(self):
+        always_rock = {"X": "R", "Y": "R", "Z": "R"}
+        always_win = {"X": "WIN", "Y": "WIN", "Z": "WIN"}
+
+        self.assertEqual(day2.score_strategies(self.file_name, [always_rock, always_win]), [12, 24])
+
+    def test_score_rounds(self):
+        round_counts = day2.count_rounds(self.file_name)
+
+        self.assertEqual(day2.score_rounds(round_counts, day2.score_table_part1), 15)
+        self.assertEqual(day2.score_rounds({}, day2.score_table_part1), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
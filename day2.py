@@ -1,3 +1,5 @@
+from collections import Counter
+
 mapping = {
     'A': 'R',
     'B': 'P',
@@ -39,11 +41,13 @@ outcomes = {
 }
 
 
-def get_score(outcome):
+def get_score(outcome, verbose=False):
     outcome_score = scores[outcomes[outcome]]
     choice_score = scores[outcome[1]]
 
-    print("{} Choice score: {}, outcome score: {}".format(outcome, outcome_score, choice_score))
+    if verbose:
+        print("{} Choice score: {}, outcome score: {}".format(outcome, outcome_score, choice_score))
+
     return outcome_score + choice_score
 
 
@@ -60,22 +64,81 @@ def get_score_strategy(original_outcome):
     return strategy_outcome, strategy_score,
 
 
-f = open("input-data/day2-input.txt", "r")
+# each strategy maps a response (X, Y or Z) to either a move or an outcome
+strategy_part1 = {'X': 'R', 'Y': 'P', 'Z': 'S'}
+strategy_part2 = {'X': 'LOSE', 'Y': 'DRAW', 'Z': 'WIN'}
+
+
+def build_score_table(strategy):
+    # precompute the score of each of the 9 possible rounds for a strategy
+    table = {}
+
+    for opponent in "ABC":
+        opponent_move = mapping[opponent]
+
+        for response in "XYZ":
+            action = strategy[response]
+
+            if action in ("WIN", "LOSE", "DRAW"):
+                move = mapping[opponent_move + action]
+            elif action in ("R", "P", "S"):
+                move = action
+            else:
+                raise ValueError(f"Invalid strategy action for {response}: {action}")
+
+            table[f"{opponent} {response}"] = get_score(opponent_move + move)
+
+    return table
+
+
+score_table_part1 = build_score_table(strategy_part1)
+score_table_part2 = build_score_table(strategy_part2)
+
+
+def count_rounds(file_name, verbose=False):
+    # single pass over the raw lines, counting occurrences of each distinct round
+    with open(file_name, "rb") as f:
+        line_counts = Counter(f)
+
+    round_counts = Counter()
+
+    for line, count in line_counts.items():
+        round_key = line.strip().decode()
+
+        if round_key == "":
+            continue
+
+        if round_key not in score_table_part1:
+            raise ValueError(f"Invalid round: {round_key}")
+
+        round_counts[round_key] += count
+
+    if verbose:
+        for round_key, count in sorted(round_counts.items()):
+            print("{} Count: {}, part 1 score: {}, part 2 score: {}".format(
+                round_key, count, score_table_part1[round_key], score_table_part2[round_key]
+            ))
+
+    return round_counts
+
+
+def score_rounds(round_counts, score_table):
+    return sum(count * score_table[round_key] for round_key, count in round_counts.items())
+
+
+def score_strategies(file_name, strategies):
+    # read the tournament once and score every strategy against the same round counts
+    round_counts = count_rounds(file_name)
 
-data = f.read().strip()
+    return [score_rounds(round_counts, build_score_table(strategy)) for strategy in strategies]
 
-games = data.split("\n")
 
-games = ["{}{}".format(mapping[game.split()[0]], mapping[game.split()[1]]) for game in games]
-games = [game[0] + mapping[game] for game in games]
+def main():
+    part1, part2 = score_strategies("input-data/day2-input.txt", [strategy_part1, strategy_part2])
 
-game_scores = [
-    {
-        'OUTCOME': game,
-        'SCORE': get_score(game)
-    } for game in games
-]
+    print(f"Part 1: {part1}")
+    print(f"Part 2: {part2}")
 
-total_score = sum([game['SCORE'] for game in game_scores])
-print(total_score)
 
+if __name__ == '__main__':
+    main()
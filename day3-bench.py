@@ -0,0 +1,120 @@
+import os
+import random
+import string
+import sys
+import tempfile
+import timeit
+
+import day3
+
+
+def create_rucksack_list(file_name, groups, seed=1):
+    # write synthetic rucksacks, each group of three shares a badge item
+    rnd = random.Random(seed)
+    items = string.ascii_letters
+
+    with open(file_name, "w") as f:
+        for group in range(0, groups):
+            badge = rnd.choice(items)
+
+            for rucksack in range(0, 3):
+                line = [rnd.choice(items) for item in range(0, rnd.randint(4, 24) * 2 - 1)]
+                line.insert(rnd.randint(0, len(line)), badge)
+                f.write("".join(line) + "\n")
+
+
+def create_padded_copy(file_name, padded_file_name, blank_line):
+    # copy a rucksack list with whitespace around every line, optionally with a
+    # blank line (an empty rucksack) after the first line
+    with open(file_name, "r") as f, open(padded_file_name, "w") as out_file:
+        for line_no, line in enumerate(f):
+            out_file.write(f" \t{line.strip()}  \r\n")
+
+            if blank_line and line_no == 0:
+                out_file.write(" \n")
+
+
+def set_totals(file_name):
+    # the original set intersection loop, without the per rucksack records
+    total_errors = 0
+    total_group_badges = 0
+
+    with open(file_name, "r") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            mid_string = len(line) // 2
+
+            for error in set(line[0:mid_string]) & set(line[mid_string:]):
+                total_errors += ord(error) - (day3.offset_lower if error.islower() else day3.offset_upper)
+
+            if line_no % 3 == 1:
+                group_badge = set(line)
+            else:
+                group_badge &= set(line)
+
+            # the badge is the shared item with the lowest priority, as in day3
+            if line_no % 3 == 0:
+                total_group_badges += min(
+                    ord(badge) - (day3.offset_lower if badge.islower() else day3.offset_upper)
+                    for badge in group_badge
+                )
+
+    return total_errors, total_group_badges
+
+
+def run_backend(func):
+    # result of a backend, or its error so failures can be compared too
+    try:
+        return func()
+    except Exception as e:
+        return type(e).__name__, str(e)
+
+
+def bench(name, func, repeat):
+    seconds = min(timeit.repeat(func, number=1, repeat=repeat))
+    print(f"{name:<20} {seconds * 1000:10.2f} ms")
+
+    return func()
+
+
+def main():
+    groups = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeat = 3
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_name = os.path.join(temp_dir, "day3-bench.txt")
+        create_rucksack_list(file_name, groups)
+
+        print(f"Rucksacks: {groups * 3:,}, file size: {os.path.getsize(file_name):,} bytes")
+
+        expected = bench(
+            "set intersections", lambda: set_totals(file_name), repeat
+        )
+        result = bench(
+            "streaming", lambda: day3.rucksack_totals(file_name)[:2], repeat
+        )
+
+        if result != expected:
+            raise AssertionError(f"Results differ: {result} != {expected}")
+
+        result = bench(
+            "numpy", lambda: day3.rucksack_totals_numpy(file_name), repeat
+        )
+
+        if result != expected:
+            raise AssertionError(f"Results differ: {result} != {expected}")
+
+        # both backends must treat whitespace and blank lines the same way
+        for blank_line in (False, True):
+            padded_file_name = os.path.join(temp_dir, "day3-bench-padded.txt")
+            create_padded_copy(file_name, padded_file_name, blank_line)
+
+            expected = run_backend(lambda: day3.rucksack_totals(padded_file_name)[:2])
+            result = run_backend(lambda: day3.rucksack_totals_numpy(padded_file_name))
+
+            if result != expected:
+                raise AssertionError(f"Results differ with blank_line={blank_line}: {result} != {expected}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+import os
+import tempfile
+import unittest
+
+import day3
+
+SAMPLE_RUCKSACKS = (
+    "vJrwpWtwJgWrhcsFMMfFFhFp\n"
+    "jqHRNqRjqzjGDLGLrsFMfFZSrLrFZsSL\n"
+    "PmmdzqPrVvPwwTWBwg\n"
+    "wMqvLMZHhHMvwLHjbvcjnnSBnvTQFn\n"
+    "ttgJtRGJQctTZtZT\n"
+    "CrZsJsPPZsGzwwsLwLmpwMDw\n"
+)
+
+
+def priority(item):
+    return ord(item) - (day3.offset_lower if item.islower() else day3.offset_upper)
+
+
+def brute_force_badges(lines, group_size):
+    # sum of the lowest priority item shared by each complete group
+    total = 0
+
+    for group in range(0, len(lines) // group_size):
+        items = set(lines[group * group_size])
+
+        for line in lines[group * group_size + 1:(group + 1) * group_size]:
+            items &= set(line)
+
+        total += min(map(priority, items))
+
+    return total
+
+
+class Day3TestCase(unittest.TestCase):
+    def setUp(self):
+        fd, self.file_name = tempfile.mkstemp()
+
+        with os.fdopen(fd, "w") as f:
+            f.write(SAMPLE_RUCKSACKS)
+
+    def tearDown(self):
+        os.remove(self.file_name)
+
+    def write(self, data):
+        with open(self.file_name, "w") as f:
+            f.write(data)
+
+
+class ItemMaskTestCase(unittest.TestCase):
+    def test_item_mask(self):
+        self.assertEqual(day3.item_mask(b""), 0)
+        self.assertEqual(day3.item_mask(b"a"), 1)
+        self.assertEqual(day3.item_mask(b"aaZ"), 1 | 1 << 51)
+
+        # bytes that are not items set no bits
+        self.assertEqual(day3.item_mask(b" b-"), 2)
+
+    def test_mask_priorities(self):
+        self.assertEqual(day3.mask_priorities(0), [])
+        self.assertEqual(day3.mask_priorities(day3.item_mask(b"pLPvts")), [16, 19, 20, 22, 38, 42])
+
+        for item in "azAZ":
+            self.assertEqual(day3.mask_priorities(day3.item_mask(item.encode())), [priority(item)])
+            self.assertEqual(day3.priority_item(priority(item)), item)
+
+    def test_common_items(self):
+        self.assertEqual(day3.common_items(b"vJrwpWtwJgWr", b"hcsFMMfFFhFp"), b"p")
+        self.assertEqual(day3.common_items(b"abc", b"cxaa"), b"caa")
+        self.assertEqual(day3.common_items(b"abc", b""), b"")
+
+
+class RucksackTotalsTestCase(Day3TestCase):
+    def test_sample(self):
+        self.assertEqual(day3.rucksack_totals(self.file_name)[:2], (157, 70))
+
+    def test_group_size(self):
+        lines = SAMPLE_RUCKSACKS.split()
+
+        for group_size in (1, 2, 3):
+            self.assertEqual(
+                day3.rucksack_totals(self.file_name, group_size=group_size)[1],
+                brute_force_badges(lines, group_size),
+                msg=f"group size {group_size}"
+            )
+
+        # an incomplete last group is not counted
+        self.write(SAMPLE_RUCKSACKS + "ab\n")
+        self.assertEqual(day3.rucksack_totals(self.file_name, group_size=3)[1], 70)
+        self.assertRaises(ValueError, lambda: day3.rucksack_totals(self.file_name, group_size=0))
+
+    def test_no_badge(self):
+        self.write("ab\ncd\n")
+
+        with self.assertRaises(ValueError) as cm:
+            day3.rucksack_totals(self.file_name, group_size=2)
+
+        self.assertEqual(str(cm.exception), "No badge found for group 1")
+
+    def test_debug_limit(self):
+        total_errors, total_group_badges, rucksacks, groups = day3.rucksack_totals(
+            self.file_name, group_size=1, debug=True, debug_limit=2
+        )
+
+        self.assertEqual(total_errors, 157)
+        self.assertEqual(len(rucksacks), 2)
+        self.assertEqual(len(groups), 2)
+        self.assertEqual(rucksacks[0]['errors'], ['p'])
+        self.assertEqual(rucksacks[0]['errors_priorities'], [16])
+        self.assertEqual(rucksacks[0]['c1'], "vJrwpWtwJgWr")
+        self.assertEqual(groups[1], {'group_no': 2, 'group_badge': 'f', 'group_badge_no': 6})
+
+        # every record without a limit, none without debug
+        self.assertEqual(len(day3.rucksack_totals(self.file_name, debug=True)[2]), 6)
+        self.assertEqual(day3.rucksack_totals(self.file_name, debug_limit=2)[2:], ([], []))
+
+
+
+@unittest.skipIf(day3.np is None, "numpy is not installed")
+class NumpyBackendTestCase(Day3TestCase):
+    def assert_backends_match(self, data, group_sizes=(1, 2, 3)):
+        # both backends give the same totals, or the same error
+        self.write(data)
+
+        for group_size in group_sizes:
+            try:
+                expected = day3.rucksack_totals(self.file_name, group_size)[:2]
+            except Exception as e:
+                with self.assertRaises(type(e)) as cm:
+                    day3.rucksack_totals_numpy(self.file_name, group_size)
+
+                self.assertEqual(str(cm.exception), str(e))
+            else:
+                self.assertEqual(day3.rucksack_totals_numpy(self.file_name, group_size), expected)
+
+    def test_sample(self):
+        self.assertEqual(day3.rucksack_totals_numpy(self.file_name), (157, 70))
+
+    def test_empty_file(self):
+        self.write("")
+
+        self.assertEqual(day3.rucksack_totals_numpy(self.file_name, group_size=1), (0, 0))
+        self.assert_backends_match("")
+
+    def test_padded_lines(self):
+        padded = "".join(f" \t{line}  \r\n" for line in SAMPLE_RUCKSACKS.split())
+
+        self.assert_backends_match(padded)
+        self.assert_backends_match(padded.rstrip())
+
+    def test_blank_lines(self):
+        lines = SAMPLE_RUCKSACKS.split()
+
+        # a blank line is an empty rucksack, which has no badge
+        self.assert_backends_match("\n".join(lines[:1] + [" "] + lines[1:]) + "\n")
+        self.assert_backends_match("\n")
+        self.assert_backends_match(SAMPLE_RUCKSACKS + "\n", group_sizes=(3,))
+
+    def test_odd_line(self):
+        self.assert_backends_match(SAMPLE_RUCKSACKS + "abc\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
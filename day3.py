@@ -1,75 +1,215 @@
-import json
+from functools import reduce
+from operator import or_
 
-rucksacks = []
-groups = []
-both_compartments = []
+try:
+    import numpy as np
+except ImportError:  # numpy is only required by rucksack_totals_numpy
+    np = None
 
 offset_upper = ord('A') - 27
 offset_lower = ord('a') - 1
-line_no = 1
-
-with open("input-data/day3-input.txt", "r") as f:
-    for line in f:
-        line = line.strip()
-        char_count = len(line)
-        mid_string = int(char_count / 2)
-
-        if char_count % 2 == 1:
-            raise Exception("Odd number of characters")
-
-        compartment_1 = set(line[0:mid_string])
-        compartment_2 = set(line[mid_string:])
-        error_set = compartment_1 & compartment_2
-
-        errors = [
-            ord(error) -
-            (offset_lower if str(error).islower() else offset_upper) for error in (error_set)
-        ]
-
-        rucksacks.append(
-            {
-                's': line,
-                'c1': line[0:mid_string],
-                'c2': line[mid_string:],
-                'errors': list(error_set),
-                'errors_priorities': errors
-            }
-        )
-
-        if line_no % 3 == 0:
-            group_badge = (group_badge & set(line)).pop()
-
-            groups.append(
+
+# byte value to item bit, an item with priority n sets bit n - 1
+priority_bits = [0] * 256
+
+for item_byte in range(ord('a'), ord('z') + 1):
+    priority_bits[item_byte] = 1 << (item_byte - offset_lower - 1)
+
+for item_byte in range(ord('A'), ord('Z') + 1):
+    priority_bits[item_byte] = 1 << (item_byte - offset_upper - 1)
+
+# byte value to item priority, 0 for bytes that are not items
+item_priorities = [bits.bit_length() for bits in priority_bits]
+
+
+def item_mask(items):
+    # 52 bit mask of the items in a compartment, rucksack or group, repeated items
+    # are dropped first so each distinct item is looked up once
+    return reduce(or_, map(priority_bits.__getitem__, set(items)), 0)
+
+
+def common_items(items_1, items_2):
+    # the items of items_2 that are also in items_1. bytes.translate deletes in C,
+    # first the items missing from items_1, then those, leaving the shared items
+    return items_2.translate(None, items_2.translate(None, items_1))
+
+
+def mask_priorities(mask):
+    # the priority of each item in the mask is the position of its bit
+    priorities = []
+
+    while mask:
+        low_bit = mask & -mask
+        priorities.append(low_bit.bit_length())
+        mask ^= low_bit
+
+    return priorities
+
+
+def priority_item(priority):
+    return chr(priority + (offset_lower if priority <= 26 else offset_upper))
+
+
+def read_rucksacks(file_name):
+    # yield each rucksack line with its two compartments
+    with open(file_name, "rb") as f:
+        for line in f:
+            line = line.strip()
+            char_count = len(line)
+            mid_string = int(char_count / 2)
+
+            if char_count % 2 == 1:
+                raise Exception("Odd number of characters")
+
+            yield line, line[0:mid_string], line[mid_string:]
+
+
+def rucksack_totals(file_name, group_size=3, debug=False, debug_limit=None):
+    # keeps only running totals and the current group's common items, per
+    # rucksack and per group records are only collected when debug is set, and
+    # then only the first debug_limit of each when a limit is given. the shared
+    # items are found with common_items, so python only touches those few items.
+    # returns (total_errors, total_group_badges, rucksacks, groups)
+    if group_size < 1:
+        raise ValueError("group_size must be at least 1")
+
+    rucksacks = []
+    groups = []
+    total_errors = 0
+    total_group_badges = 0
+    group_items = b""
+
+    for line_no, (line, compartment_1, compartment_2) in enumerate(read_rucksacks(file_name), 1):
+        shared = common_items(compartment_1, compartment_2)
+        total_errors += sum(map(item_priorities.__getitem__, set(shared)))
+
+        if debug and (debug_limit is None or len(rucksacks) < debug_limit):
+            errors = mask_priorities(item_mask(shared))
+            rucksacks.append(
                 {
-                    'group_no': int(line_no/3),
-                    'group_badge': group_badge,
-                    'group_badge_no': ord(group_badge) - (offset_lower if group_badge.islower() else offset_upper)
+                    's': line.decode(),
+                    'c1': compartment_1.decode(),
+                    'c2': compartment_2.decode(),
+                    'errors': [priority_item(error) for error in errors],
+                    'errors_priorities': errors
                 }
             )
-        elif line_no % 3 == 1:
-            group_badge = set(line)
-        elif line_no % 3 == 2:
-            group_badge = group_badge & set(line)
 
+        if (line_no - 1) % group_size == 0:
+            group_items = line
+        else:
+            group_items = common_items(group_items, line)
+
+        if line_no % group_size == 0:
+            group_badge = item_mask(group_items)
+
+            if group_badge == 0:
+                raise ValueError(f"No badge found for group {line_no // group_size}")
+
+            # the lowest set bit is the badge with the lowest priority
+            group_badge_no = (group_badge & -group_badge).bit_length()
+            total_group_badges += group_badge_no
+
+            if debug and (debug_limit is None or len(groups) < debug_limit):
+                groups.append(
+                    {
+                        'group_no': line_no // group_size,
+                        'group_badge': priority_item(group_badge_no),
+                        'group_badge_no': group_badge_no
+                    }
+                )
+
+    return total_errors, total_group_badges, rucksacks, groups
+
+
+def _mask_priorities_sum_numpy(masks):
+    # sum of the priorities of every set bit across an array of item masks
+    total = 0
+
+    for bit in range(0, 52):
+        total += (bit + 1) * int(np.count_nonzero((masks >> np.uint64(bit)) & np.uint64(1)))
+
+    return total
+
+
+def rucksack_totals_numpy(file_name, group_size=3):
+    # vectorised backend for bulk runs, the whole file is loaded as one byte array
+    # and per line masks are built with reduceat. returns (total_errors, total_group_badges)
+    if np is None:
+        raise ImportError("numpy is required for rucksack_totals_numpy")
+
+    if group_size < 1:
+        raise ValueError("group_size must be at least 1")
+
+    with open(file_name, "rb") as f:
+        data = np.frombuffer(f.read(), dtype=np.uint8)
+
+    # an empty file has no lines at all, not one blank line
+    if len(data) == 0:
+        return 0, 0
+
+    line_ends = np.flatnonzero(data == ord("\n"))
+    if len(data) > 0 and data[-1] != ord("\n"):
+        line_ends = np.append(line_ends, len(data))
+
+    line_starts = np.concatenate(([0], line_ends[:-1] + 1)).astype(np.int64)
+
+    # strip leading and trailing whitespace from each line the way bytes.strip()
+    # does in read_rucksacks, a line left blank is an empty rucksack
+    is_text = ~np.isin(data, np.frombuffer(b" \t\n\r\x0b\x0c", dtype=np.uint8))
+    text_pos = np.flatnonzero(is_text)
+    first_pos = np.searchsorted(text_pos, line_starts)
+    last_pos = np.searchsorted(text_pos, line_ends) - 1
+    has_text = first_pos <= last_pos
+
+    text_starts = text_pos[first_pos[has_text]]
+    text_lengths = text_pos[last_pos[has_text]] - text_starts + 1
+
+    if np.any(text_lengths % 2 == 1):
+        raise Exception("Odd number of characters")
+
+    compartment_1 = np.zeros(len(line_starts), dtype=np.uint64)
+    compartment_2 = np.zeros(len(line_starts), dtype=np.uint64)
+
+    # whitespace and newline bytes map to 0, so each second compartment segment
+    # can run up to the start of the next rucksack
+    if len(text_starts) > 0:
+        bits = np.array(priority_bits, dtype=np.uint64)[data]
+        segment_starts = np.column_stack((text_starts, text_starts + text_lengths // 2)).ravel()
+        compartments = np.bitwise_or.reduceat(bits, segment_starts)
+        compartment_1[has_text] = compartments[0::2]
+        compartment_2[has_text] = compartments[1::2]
+
+    total_errors = _mask_priorities_sum_numpy(compartment_1 & compartment_2)
+
+    group_count = len(line_starts) // group_size
+    line_masks = (compartment_1 | compartment_2)[:group_count * group_size]
+
+    if group_count == 0:
+        return total_errors, 0
+
+    group_badges = np.bitwise_and.reduceat(line_masks, np.arange(0, len(line_masks), group_size))
+
+    if np.any(group_badges == 0):
+        raise ValueError(f"No badge found for group {int(np.flatnonzero(group_badges == 0)[0]) + 1}")
 
-        line_no += 1
+    # keep only the lowest set bit of each badge mask, its position is the priority
+    lowest_bits = group_badges & (~group_badges + np.uint64(1))
+    total_group_badges = int(np.sum(np.log2(lowest_bits.astype(np.float64)).astype(np.int64) + 1))
 
-total_errors = sum(
-    [
-        sum(item['errors_priorities']) for item in rucksacks
-    ]
-)
+    return total_errors, total_group_badges
 
-total_group_badges = sum(
-    [
-        sum(item['group_badge_no'] for item in groups)
-    ]
-)
 
-print(groups[0])
-print(rucksacks[0:3])
-print(f"Part 1: {total_errors}")
-print(f"Part 2: {total_group_badges}")
+def main():
+    total_errors, total_group_badges, rucksacks, groups = rucksack_totals(
+        "input-data/day3-input.txt", debug=True, debug_limit=3
+    )
 
+    print(groups[0])
+    print(rucksacks[0:3])
+    print(f"Part 1: {total_errors}")
+    print(f"Part 2: {total_group_badges}")
 
 
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+import os
+import random
+import tempfile
+import unittest
+
+import day4
+
+SAMPLE_PAIRS = "2-4,6-8\n2-3,4-5\n5-7,7-9\n2-8,3-7\n6-6,4-6\n2-6,4-8\n"
+
+
+class Day4TestCase(unittest.TestCase):
+    def setUp(self):
+        fd, self.file_name = tempfile.mkstemp()
+
+        with os.fdopen(fd, "w") as f:
+            f.write(SAMPLE_PAIRS)
+
+    def tearDown(self):
+        os.remove(self.file_name)
+
+
+class CountAssignmentsTestCase(Day4TestCase):
+    def test_count_assignments(self):
+        fully_covered, over_lapped, fully_covered_pairs, over_lapped_pairs = \
+            day4.count_assignments(self.file_name, keep_pairs=True)
+
+        self.assertEqual((fully_covered, over_lapped), (2, 4))
+        self.assertEqual(fully_covered_pairs, [(2, 8, 3, 7), (6, 6, 4, 6)])
+        self.assertEqual(len(over_lapped_pairs), 4)
+
+        # pairs are only kept when asked for
+        self.assertEqual(day4.count_assignments(self.file_name)[2:], ([], []))
+
+    @unittest.skipIf(day4.np is None, "numpy is not installed")
+    def test_count_assignments_numpy(self):
+        for block_size in (1, 5, 1 << 24):
+            fully_covered, over_lapped, fully_covered_pairs, over_lapped_pairs = \
+                day4.count_assignments_numpy(self.file_name, keep_pairs=True, block_size=block_size)
+
+            self.assertEqual((fully_covered, over_lapped), (2, 4))
+            self.assertEqual(fully_covered_pairs.tolist(), [[2, 8, 3, 7], [6, 6, 4, 6]])
+            self.assertEqual(len(over_lapped_pairs), 4)
+
+
+class AssignmentIndexTestCase(Day4TestCase):
+    @staticmethod
+    def random_pairs(rnd, count):
+        pairs = []
+
+        for pair in range(0, count):
+            start1, end1 = sorted((rnd.randint(1, 30), rnd.randint(1, 30)))
+            start2, end2 = sorted((rnd.randint(1, 30), rnd.randint(1, 30)))
+            pairs.append((start1, end1, start2, end2))
+
+        return pairs
+
+    @staticmethod
+    def assignments(pairs):
+        # (pair number, side, start, end) for every assignment
+        return [
+            (pair_no, side, pair[side * 2], pair[side * 2 + 1])
+            for pair_no, pair in enumerate(pairs) for side in (0, 1)
+        ]
+
+    def test_covering(self):
+        rnd = random.Random(2)
+
+        for trial in range(0, 20):
+            pairs = self.random_pairs(rnd, rnd.randint(0, 40))
+            index = day4.AssignmentIndex(pairs)
+
+            for section in range(0, 32):
+                self.assertEqual(
+                    sorted(index.covering(section)),
+                    sorted((pair_no, side) for pair_no, side, start, end in self.assignments(pairs)
+                           if start <= section <= end)
+                )
+
+    def test_overlapping(self):
+        rnd = random.Random(3)
+
+        for trial in range(0, 20):
+            pairs = self.random_pairs(rnd, rnd.randint(0, 40))
+            index = day4.AssignmentIndex(pairs)
+
+            for range_start in range(0, 32):
+                for range_end in range(range_start, 33):
+                    self.assertEqual(
+                        sorted(index.overlapping(range_start, range_end)),
+                        sorted((pair_no, side) for pair_no, side, start, end in self.assignments(pairs)
+                               if start <= range_end and range_start <= end)
+                    )
+
+        self.assertRaises(ValueError, lambda: day4.AssignmentIndex([]).overlapping(2, 1))
+
+    def test_from_file(self):
+        index = day4.AssignmentIndex.from_file(self.file_name)
+
+        self.assertEqual(len(index), 12)
+        self.assertEqual(index.assignment_range(3, 1), (3, 7))
+        self.assertEqual(sorted(index.covering(8)), [(0, 1), (2, 1), (3, 0), (5, 1)])
+
+    def test_save_load(self):
+        index = day4.AssignmentIndex.from_file(self.file_name)
+        index_file = self.file_name + ".index"
+        index.save(index_file)
+
+        try:
+            loaded = day4.AssignmentIndex.load(index_file)
+        finally:
+            os.remove(index_file)
+
+        for section in range(0, 10):
+            self.assertEqual(sorted(loaded.covering(section)), sorted(index.covering(section)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,27 +1,253 @@
-data = []
-
-with open("input-data/day4-input.txt", "r") as f:
-    for line in f:
-        line = line.rstrip()
-        data.append(
-            [list(map(int, assignment.split('-'))) for assignment in line.split(',')]
-        )
-
-fully_covered = []
-over_lapped = []
-
-for pair in data:
-    assignment1, assignment2 = pair
-
-    if assignment2[0] <= assignment1[0] <= assignment2[1] and assignment2[1] >= assignment1[1] >= assignment2[0]:
-        fully_covered.append(pair)
-        over_lapped.append(pair)
-    elif assignment1[0] <= assignment2[0] <= assignment1[1] and assignment1[1] >= assignment2[1] >= assignment1[0]:
-        fully_covered.append(pair)
-        over_lapped.append(pair)
-    elif assignment2[0] <= assignment1[1] <= assignment2[1] or \
-            assignment1[0] <= assignment2[1] <= assignment1[1]:
-        over_lapped.append(pair)
-
-print(len(fully_covered))
-print(len(over_lapped))
+import bisect
+import pickle
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only required by the column backend
+    np = None
+
+
+def read_assignments(file_name):
+    # yield each pair as (start1, end1, start2, end2)
+    with open(file_name, "r") as f:
+        for line in f:
+            line = line.rstrip()
+
+            if line == "":
+                continue
+
+            assignment1, assignment2 = [list(map(int, assignment.split('-'))) for assignment in line.split(',')]
+            yield assignment1[0], assignment1[1], assignment2[0], assignment2[1]
+
+
+def count_assignments(file_name, keep_pairs=False):
+    # pure python backend, returns (fully covered count, overlapped count,
+    # fully covered pairs, overlapped pairs), the pair lists are only filled when
+    # keep_pairs is set
+    fully_covered = []
+    over_lapped = []
+    fully_covered_count = 0
+    over_lapped_count = 0
+
+    for pair in read_assignments(file_name):
+        start1, end1, start2, end2 = pair
+
+        if start1 <= end2 and start2 <= end1:
+            over_lapped_count += 1
+
+            if keep_pairs:
+                over_lapped.append(pair)
+
+            if (start1 <= start2 and end2 <= end1) or (start2 <= start1 and end1 <= end2):
+                fully_covered_count += 1
+
+                if keep_pairs:
+                    fully_covered.append(pair)
+
+    return fully_covered_count, over_lapped_count, fully_covered, over_lapped
+
+
+# bytes.translate table turning the "-" and "," separators into spaces
+_separator_table = bytes.maketrans(b",-", b"  ")
+
+
+def iter_assignment_columns(file_name, block_size=1 << 24):
+    # parse the file in line aligned blocks, yielding four int32 columns per
+    # block: start1, end1, start2, end2. numbers are parsed straight into an
+    # array with no per number objects
+    if np is None:
+        raise ImportError("numpy is required for iter_assignment_columns")
+
+    remainder = b""
+
+    with open(file_name, "rb") as f:
+        while True:
+            block = f.read(block_size)
+            data = remainder + block
+
+            if block != b"":
+                # hold back the partial last line until the next block
+                line_end = data.rfind(b"\n") + 1
+                data, remainder = data[:line_end], data[line_end:]
+
+            if data != b"":
+                values = np.fromstring(data.translate(_separator_table).decode(), dtype=np.int32, sep=" ")
+
+                if len(values) % 4 != 0:
+                    raise ValueError("Each line must contain two assignments")
+
+                columns = values.reshape(-1, 4)
+                yield columns[:, 0], columns[:, 1], columns[:, 2], columns[:, 3]
+
+            if block == b"":
+                break
+
+
+def read_assignment_columns(file_name):
+    # parse the whole file into four int32 columns: start1, end1, start2, end2
+    blocks = list(iter_assignment_columns(file_name))
+
+    if len(blocks) == 0:
+        return tuple(np.zeros(0, dtype=np.int32) for column in range(0, 4))
+
+    return tuple(np.concatenate([block[column] for block in blocks]) for column in range(0, 4))
+
+
+def count_assignments_numpy(file_name, keep_pairs=False, block_size=1 << 24):
+    # column backend, containment and overlap are boolean array expressions
+    # evaluated one block at a time. returns the same tuple as count_assignments
+    # with the pairs as (n, 4) arrays
+    fully_covered_count = 0
+    over_lapped_count = 0
+    fully_covered_pairs = []
+    over_lapped_pairs = []
+
+    for start1, end1, start2, end2 in iter_assignment_columns(file_name, block_size):
+        over_lapped = (start1 <= end2) & (start2 <= end1)
+        fully_covered = ((start1 <= start2) & (end2 <= end1)) | ((start2 <= start1) & (end1 <= end2))
+
+        fully_covered_count += int(np.count_nonzero(fully_covered))
+        over_lapped_count += int(np.count_nonzero(over_lapped))
+
+        if keep_pairs:
+            pairs = np.column_stack((start1, end1, start2, end2))
+            fully_covered_pairs.append(pairs[fully_covered])
+            over_lapped_pairs.append(pairs[over_lapped])
+
+    if keep_pairs:
+        fully_covered_pairs = np.concatenate(fully_covered_pairs) if fully_covered_pairs else \
+            np.zeros((0, 4), dtype=np.int32)
+        over_lapped_pairs = np.concatenate(over_lapped_pairs) if over_lapped_pairs else \
+            np.zeros((0, 4), dtype=np.int32)
+
+    return fully_covered_count, over_lapped_count, fully_covered_pairs, over_lapped_pairs
+
+
+class AssignmentIndex:
+    """ Interval index over every section assignment.
+
+    Assignments are identified by (pair number, side) where side is 0 or 1 for
+    the first or second elf of the pair. A centered interval tree answers
+    stabbing queries and a sorted array of starts extends those to range overlap
+    queries, both in O(log n + k).
+    """
+
+    def __init__(self, pairs=()):
+        self._starts = []
+        self._ends = []
+
+        for start1, end1, start2, end2 in pairs:
+            self._starts.extend((start1, start2))
+            self._ends.extend((end1, end2))
+
+        self._start_order = sorted(range(0, len(self._starts)), key=self._starts.__getitem__)
+        self._sorted_starts = [self._starts[item] for item in self._start_order]
+        self._tree = self._build(list(range(0, len(self._starts))))
+
+    def __len__(self):
+        return len(self._starts)
+
+    @classmethod
+    def from_file(cls, file_name):
+        return cls(read_assignments(file_name))
+
+    @classmethod
+    def load(cls, file_name):
+        with open(file_name, "rb") as f:
+            index = pickle.load(f)
+
+        if not isinstance(index, cls):
+            raise TypeError(f"Expecting {cls} in {file_name}, got {type(index)}")
+
+        return index
+
+    def save(self, file_name):
+        with open(file_name, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _build(self, items):
+        # each node is [center, starts ascending, ids, ends descending, ids, left, right]
+        if len(items) == 0:
+            return None
+
+        endpoints = sorted([self._starts[item] for item in items] + [self._ends[item] for item in items])
+        center = endpoints[len(endpoints) // 2]
+
+        left = [item for item in items if self._ends[item] < center]
+        right = [item for item in items if self._starts[item] > center]
+        here = [item for item in items if self._starts[item] <= center <= self._ends[item]]
+
+        by_start = sorted(here, key=self._starts.__getitem__)
+        by_end = sorted(here, key=self._ends.__getitem__, reverse=True)
+
+        return [
+            center,
+            [self._starts[item] for item in by_start], by_start,
+            [self._ends[item] for item in by_end], by_end,
+            self._build(left), self._build(right)
+        ]
+
+    @staticmethod
+    def _assignment(item):
+        return divmod(item, 2)
+
+    def assignment_range(self, pair_no, side):
+        item = pair_no * 2 + side
+        return self._starts[item], self._ends[item]
+
+    def covering(self, section):
+        # assignments that cover a section, as (pair number, side)
+        found = []
+        node = self._tree
+
+        while node is not None:
+            center, starts, start_ids, ends, end_ids, left, right = node
+
+            if section < center:
+                # every interval here ends at or after center, so only starts matter
+                for start, item in zip(starts, start_ids):
+                    if start > section:
+                        break
+                    found.append(item)
+                node = left
+            elif section > center:
+                for end, item in zip(ends, end_ids):
+                    if end < section:
+                        break
+                    found.append(item)
+                node = right
+            else:
+                found.extend(start_ids)
+                node = None
+
+        return [self._assignment(item) for item in found]
+
+    def overlapping(self, range_start, range_end):
+        # assignments that overlap [range_start, range_end] are those covering
+        # range_start plus those starting inside (range_start, range_end]
+        if range_start > range_end:
+            raise ValueError("range_start must not be greater than range_end")
+
+        found = self.covering(range_start)
+
+        first = bisect.bisect_right(self._sorted_starts, range_start)
+        last = bisect.bisect_right(self._sorted_starts, range_end)
+        found.extend(self._assignment(item) for item in self._start_order[first:last])
+
+        return found
+
+
+def main():
+    file_name = "input-data/day4-input.txt"
+
+    if np is None:
+        fully_covered, over_lapped, _, _ = count_assignments(file_name)
+    else:
+        fully_covered, over_lapped, _, _ = count_assignments_numpy(file_name)
+
+    print(fully_covered)
+    print(over_lapped)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+import io
+import os
+import random
+import tempfile
+import unittest
+
+import day5
+
+SAMPLE_INPUT = (
+    "    [D]    \n"
+    "[N] [C]    \n"
+    "[Z] [M] [P]\n"
+    " 1   2   3 \n"
+    "\n"
+    "move 1 from 2 to 1\n"
+    "move 3 from 1 to 3\n"
+    "move 2 from 2 to 1\n"
+    "move 1 from 1 to 2\n"
+)
+
+
+class Day5TestCase(unittest.TestCase):
+    def setUp(self):
+        fd, self.file_name = tempfile.mkstemp()
+
+        with os.fdopen(fd, "w") as f:
+            f.write(SAMPLE_INPUT)
+
+    def tearDown(self):
+        os.remove(self.file_name)
+
+
+class ReadInputTestCase(Day5TestCase):
+    def test_read_input(self):
+        stack_item_lines, movements = day5.read_input(self.file_name)
+
+        self.assertEqual(stack_item_lines, [["", "D", ""], ["N", "C", ""], ["Z", "M", "P"], ["1", "2", "3"]])
+        self.assertEqual(movements, [(1, 1, 0), (3, 0, 2), (2, 1, 0), (1, 0, 1)])
+
+    def test_read_drawing(self):
+        f = io.StringIO(SAMPLE_INPUT)
+        day5.read_drawing(f)
+
+        # the file is left positioned at the movements
+        self.assertEqual(next(day5.read_movements(f)), (1, 1, 0))
+
+    def test_parse_movement(self):
+        self.assertEqual(day5.parse_movement("move 12 from 3 to 9\n"), (12, 2, 8))
+        self.assertEqual(day5.parse_movement("move  1 from 2 to 1"), (1, 1, 0))
+
+        self.assertRaises(ValueError, lambda: day5.parse_movement("move 1 from 2"))
+
+    def test_stack_names(self):
+        self.assertRaises(ValueError, lambda: day5.create_stacks([["A", "B"], ["1", "3"]]))
+
+
+class SimulationTestCase(Day5TestCase):
+    def test_run_simulations(self):
+        stacks_sim1, stacks_sim2 = day5.run_simulations(self.file_name)
+
+        self.assertEqual(stacks_sim1, [["C"], ["M"], ["P", "D", "N", "Z"]])
+        self.assertEqual(stacks_sim2, [["M"], ["C"], ["P", "Z", "N", "D"]])
+
+
+class StackHistoryTestCase(Day5TestCase):
+    def test_state_at(self):
+        stack_item_lines, movements = day5.read_input(self.file_name)
+
+        for interval in range(1, 6):
+            history = day5.StackHistory(stack_item_lines, movements, interval)
+            self.assertEqual(len(history), 4)
+
+            for move_no in range(0, len(movements) + 1):
+                stacks_sim1 = day5.create_stacks(stack_item_lines)
+                stacks_sim2 = day5.create_stacks(stack_item_lines)
+                day5.perform_movements(stacks_sim1, stacks_sim2, movements[:move_no])
+
+                self.assertEqual(history.state_at(move_no), (stacks_sim1, stacks_sim2))
+
+    def test_state_at_range(self):
+        history = day5.StackHistory.from_file(self.file_name, interval=2)
+
+        self.assertEqual(history.state_at(4), day5.run_simulations(self.file_name))
+        self.assertRaises(IndexError, lambda: history.state_at(-1))
+        self.assertRaises(IndexError, lambda: history.state_at(5))
+        self.assertRaises(ValueError, lambda: day5.StackHistory.from_file(self.file_name, interval=0))
+
+
+class SolveTopsBackwardTestCase(Day5TestCase):
+    @staticmethod
+    def random_input(rnd):
+        # returns drawing lines and movements that are valid for both simulations
+        stack_count = rnd.randint(1, 5)
+        stacks = [[chr(ord("A") + rnd.randint(0, 25)) for crate in range(0, rnd.randint(0, 5))]
+                  for stack in range(0, stack_count)]
+        height = max(len(stack) for stack in stacks)
+
+        stack_item_lines = [
+            [stack[height - 1 - row] if height - 1 - row < len(stack) else "" for stack in stacks]
+            for row in range(0, height)
+        ]
+        stack_item_lines.append([str(stack) for stack in range(1, stack_count + 1)])
+
+        # both simulations keep the same stack sizes, so one is enough to
+        # check a move is possible
+        sizes = [len(stack) for stack in stacks]
+        movements = []
+
+        for move in range(0, rnd.randint(0, 30)):
+            from_stack = rnd.randrange(stack_count)
+            to_stack = rnd.randrange(stack_count)
+            moves = rnd.randint(0, sizes[from_stack])
+
+            if from_stack != to_stack:
+                sizes[from_stack] -= moves
+                sizes[to_stack] += moves
+
+            movements.append((moves, from_stack, to_stack))
+
+        return stack_item_lines, movements
+
+    def test_sample(self):
+        stack_item_lines, movements = day5.read_input(self.file_name)
+
+        self.assertEqual(day5.solve_tops_backward(stack_item_lines, movements), "CMZ")
+        self.assertEqual(day5.solve_tops_backward(stack_item_lines, movements, multiple_crates=True), "MCD")
+
+    def test_matches_simulation(self):
+        rnd = random.Random(5)
+
+        for trial in range(0, 200):
+            stack_item_lines, movements = self.random_input(rnd)
+
+            stacks_sim1 = day5.create_stacks(stack_item_lines)
+            stacks_sim2 = day5.create_stacks(stack_item_lines)
+            day5.perform_movements(stacks_sim1, stacks_sim2, movements)
+
+            self.assertEqual(
+                day5.solve_tops_backward(stack_item_lines, movements),
+                "".join(stack[-1] for stack in stacks_sim1 if stack)
+            )
+            self.assertEqual(
+                day5.solve_tops_backward(stack_item_lines, movements, multiple_crates=True),
+                "".join(stack[-1] for stack in stacks_sim2 if stack)
+            )
+
+    def test_same_stack(self):
+        stack_item_lines = [["A", ""], ["B", "C"], ["1", "2"]]
+
+        # moving crates onto the stack they came from leaves it unchanged
+        self.assertEqual(day5.solve_tops_backward(stack_item_lines, [(2, 0, 0)]), "AC")
+        self.assertEqual(day5.solve_tops_backward(stack_item_lines, [(2, 0, 0), (1, 0, 1)]), "BA")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,25 +1,26 @@
 import re
 
-stacks_sim1 = {}
-stacks_sim2 = {}
+from array import array
 
-movements = []
+movement_regex = re.compile(r"^move (\d+) from (\d+) to (\d+)$")
 
-stack_item_lines = []
-stack_list_line = ""
 
+def parse_movement(movement_line):
+    # extract (total, from stack index, to stack index) from a movement line,
+    # stack indexes are zero based. split is tried first as the fast path
+    parts = movement_line.split()
 
-def get_movement_info(movement_line):
-    # extract movement info from movement line
-    regex = r"^move (\d+) from (\d+) to (\d+)$"
-    m = re.match(regex, movement_line)
+    if len(parts) == 6 and parts[0] == "move" and parts[2] == "from" and parts[4] == "to":
+        total, from_stack, to_stack = parts[1], parts[3], parts[5]
+    else:
+        m = movement_regex.match(movement_line.strip())
 
-    return {
-        'from': m.group(2),
-        'to': m.group(3),
-        'total': int(m.group(1)),
-        'string': m.group(0)
-    }
+        if m is None:
+            raise ValueError(f"Invalid movement line: {movement_line.strip()}")
+
+        total, from_stack, to_stack = m.groups()
+
+    return int(total), int(from_stack) - 1, int(to_stack) - 1
 
 
 def fixed_width_split_string(string, size):
@@ -34,7 +35,9 @@ def fixed_width_split_string(string, size):
     return ret_list
 
 
-with open("input-data/day5-input.txt", "r") as f:
+def read_drawing(f):
+    # read the drawing lines from an open file, the last being the stack names
+    stack_item_lines = []
     line = f.readline()
 
     while line.rstrip() != "":
@@ -43,60 +46,214 @@ with open("input-data/day5-input.txt", "r") as f:
 
         line = f.readline()
 
+    return stack_item_lines
+
+
+def read_movements(f):
+    # yield each movement from an open file positioned after the drawing
     line = f.readline()
 
     while line.rstrip() != "":
-        movements.append(get_movement_info(line))
+        yield parse_movement(line)
         line = f.readline()
 
 
-# create initial stacks
-pos = 0
-for stack in stack_item_lines[len(stack_item_lines)-1]:
-    items = list(
-            filter(
-                lambda item: item != "",
-                [item[pos] for item in stack_item_lines[:-1]]
-            )
-    )
-    items.reverse()
-    stacks_sim1[stack] = items
-    stacks_sim2[stack] = items.copy()
-    pos += 1
+def read_input(file_name):
+    # returns the drawing lines and the full list of movements
+    with open(file_name, "r") as f:
+        stack_item_lines = read_drawing(f)
+        movements = list(read_movements(f))
+
+    return stack_item_lines, movements
 
 
-# perform movements
-pos = 1
+def check_stack_names(stack_item_lines):
+    # stacks are indexed by position, so the names in the drawing must be 1 to n
+    stack_names = stack_item_lines[len(stack_item_lines)-1]
 
-for movement in movements:
-    from_stack = movement["from"]
-    to_stack = movement["to"]
-    moves = movement["total"]
+    if stack_names != [str(stack) for stack in range(1, len(stack_names) + 1)]:
+        raise ValueError(f"Stack names must be numbered from 1, got {stack_names}")
 
-    for move in range(0, moves):
-        stacks_sim1[to_stack].append(
-            stacks_sim1[from_stack].pop()
+    return stack_names
+
+
+def create_stacks(stack_item_lines):
+    # create initial stacks, bottom crate first
+    stacks = []
+    stack_names = check_stack_names(stack_item_lines)
+
+    for pos in range(0, len(stack_names)):
+        items = list(
+                filter(
+                    lambda item: item != "",
+                    [item[pos] for item in stack_item_lines[:-1]]
+                )
         )
+        items.reverse()
+        stacks.append(items)
+
+    return stacks
+
+
+def apply_movement(stacks_sim1, stacks_sim2, moves, from_stack, to_stack):
+    if moves == 0:
+        return
+
+    # crates are moved one at a time, so they land in reverse order
+    stacks_sim1[to_stack].extend(
+        stacks_sim1[from_stack][:-moves - 1:-1]
+    )
+    del stacks_sim1[from_stack][-moves:]
 
     stacks_sim2[to_stack].extend(
         stacks_sim2[from_stack][-moves:]
     )
     del stacks_sim2[from_stack][-moves:]
 
-    pos += 1
 
-print(stacks_sim2)
-print(
-    "".join(
-        [
-            stacks_sim1[stack][-1] for stack in stacks_sim1
-        ]
+def perform_movements(stacks_sim1, stacks_sim2, movements):
+    for moves, from_stack, to_stack in movements:
+        apply_movement(stacks_sim1, stacks_sim2, moves, from_stack, to_stack)
+
+
+def run_simulations(file_name):
+    # apply each movement to both simulations as it is read, the movements are
+    # never kept. returns (stacks_sim1, stacks_sim2)
+    with open(file_name, "r") as f:
+        stack_item_lines = read_drawing(f)
+
+        stacks_sim1 = create_stacks(stack_item_lines)
+        stacks_sim2 = create_stacks(stack_item_lines)
+
+        perform_movements(stacks_sim1, stacks_sim2, read_movements(f))
+
+    return stacks_sim1, stacks_sim2
+
+
+class StackHistory:
+    """ Random access to the state of both simulations after any move.
+
+    The stacks are snapshotted every interval moves, each stack stored as a
+    string of its crates. A query restores the nearest snapshot at or before the
+    move and replays at most interval - 1 moves from there.
+    """
+
+    @property
+    def interval(self):
+        return self._interval
+
+    def __init__(self, stack_item_lines, movements, interval=1000):
+        if interval < 1:
+            raise ValueError("interval must be at least 1")
+
+        self._interval = interval
+        self._movements = array('l')
+        self._snapshots = []
+
+        stacks_sim1 = create_stacks(stack_item_lines)
+        stacks_sim2 = create_stacks(stack_item_lines)
+        self._take_snapshot(stacks_sim1, stacks_sim2)
+
+        for movement in movements:
+            apply_movement(stacks_sim1, stacks_sim2, *movement)
+            self._movements.extend(movement)
+
+            if len(self) % interval == 0:
+                self._take_snapshot(stacks_sim1, stacks_sim2)
+
+    def __len__(self):
+        return len(self._movements) // 3
+
+    @classmethod
+    def from_file(cls, file_name, interval=1000):
+        with open(file_name, "r") as f:
+            return cls(read_drawing(f), read_movements(f), interval)
+
+    def _take_snapshot(self, stacks_sim1, stacks_sim2):
+        self._snapshots.append(
+            (
+                tuple("".join(stack) for stack in stacks_sim1),
+                tuple("".join(stack) for stack in stacks_sim2),
+            )
+        )
+
+    def state_at(self, move_no):
+        # returns (stacks_sim1, stacks_sim2) after the first move_no moves
+        if not 0 <= move_no <= len(self):
+            raise IndexError(f"move_no must be between 0 and {len(self)}")
+
+        snapshot_no = move_no // self._interval
+        snapshot_sim1, snapshot_sim2 = self._snapshots[snapshot_no]
+
+        stacks_sim1 = [list(stack) for stack in snapshot_sim1]
+        stacks_sim2 = [list(stack) for stack in snapshot_sim2]
+
+        for pos in range(snapshot_no * self._interval, move_no):
+            apply_movement(stacks_sim1, stacks_sim2, *self._movements[pos * 3:pos * 3 + 3])
+
+        return stacks_sim1, stacks_sim2
+
+
+def solve_tops_backward(stack_item_lines, movements, multiple_crates=False):
+    # start from the top of every final stack and walk the movements backward,
+    # tracking which stack and depth (from the top) each of those crates came
+    # from. the drawing is only read at the end. multiple_crates selects the
+    # CrateMover 9001 model that keeps the order of the moved crates
+    positions = [[stack, 0] for stack in range(0, len(check_stack_names(stack_item_lines)))]
+
+    for moves, from_stack, to_stack in reversed(movements):
+        # moving crates onto the same stack leaves it unchanged
+        if from_stack == to_stack:
+            continue
+
+        for position in positions:
+            stack, depth = position
+
+            if stack == to_stack:
+                if depth < moves:
+                    position[0] = from_stack
+                    position[1] = depth if multiple_crates else moves - 1 - depth
+                else:
+                    position[1] = depth - moves
+            elif stack == from_stack:
+                position[1] = depth + moves
+
+    # look each crate up in the drawing rows, top row first, by counting the
+    # crates in its column. a final stack left empty tracks the slot just below
+    # its bottom crate, so it maps past the bottom of the drawing
+    tops = []
+
+    for stack, depth in positions:
+        for row in stack_item_lines[:-1]:
+            if stack < len(row) and row[stack] != "":
+                if depth == 0:
+                    tops.append(row[stack])
+                    break
+
+                depth -= 1
+
+    return "".join(tops)
+
+
+def main():
+    stacks_sim1, stacks_sim2 = run_simulations("input-data/day5-input.txt")
+
+    print(stacks_sim2)
+    print(
+        "".join(
+            [
+                stack[-1] for stack in stacks_sim1
+            ]
+        )
     )
-)
-print(
-    "".join(
-        [
-            stacks_sim2[stack][-1] for stack in stacks_sim2
-        ]
+    print(
+        "".join(
+            [
+                stack[-1] for stack in stacks_sim2
+            ]
+        )
     )
-)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+import asyncio
+import functools
+import os
+import random
+import tempfile
+import unittest
+
+import day6
+
+SAMPLE_MARKERS = [
+    ("mjqjpqmgbljsphdztnvjfqwrcgsmlb", 7, 19),
+    ("bvwbjplbgvbhsrlpgdmjqwftvncz", 5, 23),
+    ("nppdvjthqldpwncqszvftbrmjlhg", 6, 23),
+    ("nznrnfrfntjfmvfwmzdfjlvtqnbhcprsg", 10, 29),
+    ("zcfzfwzzqfrljwzlrfnpqdbhtmscgvjw", 11, 26),
+]
+
+
+def brute_force_markers(data, window_size):
+    # every position where the last window_size characters are all different
+    return [
+        pos for pos in range(window_size, len(data) + 1)
+        if len(set(data[pos - window_size:pos])) == window_size
+    ]
+
+
+class Day6TestCase(unittest.TestCase):
+    def setUp(self):
+        fd, self.file_name = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.file_name)
+
+    def write(self, data):
+        with open(self.file_name, "wb") as f:
+            f.write(data)
+
+
+class MarkerDetectorTestCase(Day6TestCase):
+    def test_samples(self):
+        for data, marker4, marker14 in SAMPLE_MARKERS:
+            self.write(data.encode())
+
+            self.assertEqual(day6.find_markers(self.file_name, (4, 14)), {4: marker4, 14: marker14})
+            self.assertEqual(day6.find_markers(self.file_name, (4, 14), buffer_size=3), {4: marker4, 14: marker14})
+
+    def test_feed(self):
+        detector = day6.MarkerDetector((4, 14))
+
+        self.assertEqual(detector.feed(b"mjqjpq"), {})
+        self.assertEqual(detector.feed(b"mgb"), {4: 7})
+        self.assertFalse(detector.done)
+        self.assertEqual(detector.feed(b"ljsphdztnvjfqwrcgsmlb"), {14: 19})
+        self.assertTrue(detector.done)
+        self.assertEqual(detector.position, 30)
+
+    def test_no_marker(self):
+        self.write(b"abcabcabc")
+
+        self.assertEqual(day6.find_markers(self.file_name, (3, 4)), {3: 3, 4: None})
+        self.assertRaises(ValueError, lambda: day6.MarkerDetector((0,)))
+
+
+class AllMarkersTestCase(Day6TestCase):
+    def test_all_markers(self):
+        rnd = random.Random(18)
+
+        for trial in range(0, 20):
+            data = bytes(rnd.choice(b"abcdef") for pos in range(0, rnd.randint(0, 80)))
+            self.write(data)
+
+            for window_size in (1, 3, 5):
+                markers = brute_force_markers(data, window_size)
+
+                for buffer_size in (1, 7, 1 << 20):
+                    self.assertEqual(list(day6.iter_all_markers(self.file_name, window_size, buffer_size)), markers)
+
+    def test_feed_all_markers(self):
+        detector = day6.MarkerDetector((2, 3), all_markers=True)
+
+        self.assertEqual(detector.feed(b"aab"), {2: [3], 3: []})
+        self.assertEqual(detector.feed(b"ca"), {2: [4, 5], 3: [4, 5]})
+        self.assertEqual(detector.markers, {2: 3, 3: 4})
+        self.assertFalse(detector.done)
+
+    def test_write_all_markers(self):
+        self.write(b"abcabcc")
+        out_file_name = self.file_name + ".markers"
+
+        try:
+            self.assertEqual(day6.write_all_markers(self.file_name, out_file_name, 3, buffer_size=2), 4)
+
+            positions = day6.array('q')
+
+            with open(out_file_name, "rb") as f:
+                positions.fromfile(f, 4)
+        finally:
+            os.remove(out_file_name)
+
+        self.assertEqual(positions.tolist(), [3, 4, 5, 6])
+
+    def test_marker_statistics(self):
+        self.write(b"abcabccabcd")
+
+        # markers at 3, 4, 5, 6 then 9, 10, 11
+        self.assertEqual(day6.marker_statistics(self.file_name, 3), (7, {4: 1, 3: 1}))
+        self.assertRaises(ValueError, lambda: list(day6.iter_all_markers(self.file_name, 0)))
+
+
+class ParallelFindMarkerTestCase(Day6TestCase):
+    def test_chunk_boundaries(self):
+        rnd = random.Random(6)
+
+        for trial in range(0, 10):
+            data = bytes(rnd.choice(b"abcdef") for pos in range(0, rnd.randint(1, 60)))
+            self.write(data)
+
+            for window_size in (1, 4, 6):
+                markers = brute_force_markers(data, window_size)
+                expected = markers[0] if markers else None
+
+                # small chunks and blocks put markers across both boundaries
+                for chunks in (1, 3, 7, 200):
+                    self.assertEqual(
+                        day6.parallel_find_marker(self.file_name, window_size, workers=2, chunks=chunks, block_size=2),
+                        expected,
+                        msg=f"{data} window {window_size} chunks {chunks}"
+                    )
+
+    def test_empty_file(self):
+        self.assertIsNone(day6.parallel_find_marker(self.file_name, 4))
+
+
+
+class StreamMarkersTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_small_chunks(self):
+        reader = asyncio.StreamReader()
+        markers = day6.detect_stream_markers(reader, (4, 14), read_size=3)
+        data = b"mjqjpqmgbljsphdztnvjfqwrcgsmlb"
+
+        # the first marker is yielded before the rest of the stream arrives
+        reader.feed_data(data[:7])
+        self.assertEqual(await anext(markers), (4, 7))
+
+        for pos in range(7, len(data), 2):
+            reader.feed_data(data[pos:pos + 2])
+
+        reader.feed_eof()
+        self.assertEqual([marker async for marker in markers], [(14, 19)])
+
+    async def test_position_order(self):
+        # markers found in the same read come out in position order
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"bvwbjplbgvbhsrlpgdmjqwftvncz")
+        reader.feed_eof()
+
+        self.assertEqual(
+            [marker async for marker in day6.detect_stream_markers(reader, (14, 4, 5))],
+            [(4, 5), (5, 6), (14, 23)]
+        )
+
+    async def test_stream_ends_first(self):
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"abcabcd")
+        reader.feed_eof()
+
+        self.assertEqual([marker async for marker in day6.detect_stream_markers(reader, (4, 14))], [(4, 7)])
+
+    async def request(self, port, data):
+        # send data, close the sending side and return the whole reply
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(data)
+        writer.write_eof()
+        reply = await reader.read()
+        writer.close()
+        await writer.wait_closed()
+
+        return reply
+
+    async def test_server_reply(self):
+        server = await asyncio.start_server(
+            functools.partial(day6._handle_marker_connection, window_sizes=(4, 14)), "127.0.0.1", 0
+        )
+        port = server.sockets[0].getsockname()[1]
+
+        async with server:
+            replies = await asyncio.gather(
+                *[self.request(port, b"mjqjpqmgbljsphdztnvjfqwrcgsmlb" * 100) for connection in range(0, 20)]
+            )
+            self.assertEqual(replies, [b"4 7\n14 19\n"] * 20)
+
+            # a stream that ends before every marker is found gets the ones it has
+            self.assertEqual(await self.request(port, b"abcabcd"), b"4 7\n")
+            self.assertEqual(await self.request(port, b""), b"")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,33 +1,305 @@
-with open("input-data/day6-input.txt", "r") as f:
-    pos = 4
-    current4 = f.read(4)
-    current14 = current4
-    # cont = True
+import asyncio
+import functools
+import mmap
+import multiprocessing
+import os
+import sys
 
-    while True:
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 
-        c = f.read(1)
 
-        if c == '':
-            break
+class MarkerDetector:
+    """ Finds start markers in a stream fed one chunk at a time.
+
+    A marker for a window size is the first position where the last window size
+    characters are all different. The index each byte value was last seen at is
+    kept in a table, so the length of the run of distinct characters ending at
+    each position is known in O(1) and every window size is found in one pass.
+    Positions are the number of characters processed when the marker completes.
+    With all_markers set every marker position is reported, not just the first.
+    """
+
+    @property
+    def markers(self):
+        return self._markers
+
+    @property
+    def done(self):
+        return len(self._pending) == 0
+
+    @property
+    def position(self):
+        return self._pos
+
+    def __init__(self, window_sizes=(4, 14), all_markers=False):
+        if len(window_sizes) == 0 or min(window_sizes) < 1:
+            raise ValueError("window sizes must be at least 1")
+
+        self._all_markers = all_markers
+        self._last_seen = [-1] * 256
+        self._pos = 0
+        self._run_start = 0
+        self._pending = sorted(set(window_sizes))
+        self._markers = {window_size: None for window_size in window_sizes}
+
+    def feed(self, chunk):
+        # process a chunk of bytes, returns {window size: position} of the markers
+        # found in this chunk, or {window size: [positions]} with all_markers
+        all_markers = self._all_markers
+        found = {window_size: [] for window_size in self._pending} if all_markers else {}
+
+        if self.done:
+            self._pos += len(chunk)
+            return found
+
+        last_seen = self._last_seen
+        run_start = self._run_start
+        pos = self._pos
+        pending = self._pending
+
+        for byte in chunk:
+            if last_seen[byte] >= run_start:
+                run_start = last_seen[byte] + 1
 
-        if len(current4) == len(set(current4)):
-            comm_start = pos
+            last_seen[byte] = pos
+            pos += 1
+
+            # run length is pos - run_start, pending is sorted smallest first
+            if all_markers:
+                for window_size in pending:
+                    if pos - run_start < window_size:
+                        break
+
+                    found[window_size].append(pos)
+            else:
+                while pending and pos - run_start >= pending[0]:
+                    found[pending.pop(0)] = pos
+
+                if not pending:
+                    break
+
+        if all_markers:
+            for window_size, positions in found.items():
+                if positions and self._markers[window_size] is None:
+                    self._markers[window_size] = positions[0]
         else:
-            current4 = current4[1:] + c
+            self._markers.update(found)
 
-        if len(current14) < 14:
-            pass
-        elif len(current14) == len(set(current14)):
-            msg_start = pos
-            break
+        self._run_start = run_start
+        self._pos += len(chunk)
+
+        return found
+
+
+def find_markers(file_name, window_sizes=(4, 14), buffer_size=1 << 20):
+    # scan a file in large buffers until every window size has a marker,
+    # returns {window size: position}, None for window sizes with no marker
+    detector = MarkerDetector(window_sizes)
+
+    with open(file_name, "rb") as f:
+        while not detector.done:
+            chunk = f.read(buffer_size)
 
-        pos += 1
+            if chunk == b"":
+                break
 
-        if len(current14) < 14:
-            current14 = current14 + c
+            detector.feed(chunk)
+
+    return detector.markers
+
+
+def _iter_marker_batches(file_name, window_size, buffer_size):
+    # yield, per buffer read, the list of every position where the last
+    # window_size characters are all different
+    detector = MarkerDetector((window_size,), all_markers=True)
+
+    with open(file_name, "rb") as f:
+        while True:
+            chunk = f.read(buffer_size)
+
+            if chunk == b"":
+                break
+
+            yield detector.feed(chunk)[window_size]
+
+
+def iter_all_markers(file_name, window_size, buffer_size=1 << 20):
+    # generator of every marker position, not just the first
+    for positions in _iter_marker_batches(file_name, window_size, buffer_size):
+        yield from positions
+
+
+def write_all_markers(file_name, out_file_name, window_size, buffer_size=1 << 20):
+    # write every marker position to out_file_name as native 64 bit integers,
+    # readable with array('q').fromfile. returns the number of markers
+    count = 0
+
+    with open(out_file_name, "wb") as out_file:
+        for positions in _iter_marker_batches(file_name, window_size, buffer_size):
+            array('q', positions).tofile(out_file)
+            count += len(positions)
+
+    return count
+
+
+def marker_statistics(file_name, window_size, buffer_size=1 << 20):
+    # returns (marker count, Counter of run length: number of runs), a run being
+    # a stretch of consecutive positions that are all markers
+    count = 0
+    run_lengths = Counter()
+    run_length = 0
+    previous = None
+
+    for position in iter_all_markers(file_name, window_size, buffer_size):
+        count += 1
+
+        if previous is not None and position == previous + 1:
+            run_length += 1
         else:
-            current14 = current14[1:] + c
+            if run_length > 0:
+                run_lengths[run_length] += 1
+
+            run_length = 1
+
+        previous = position
+
+    if run_length > 0:
+        run_lengths[run_length] += 1
+
+    return count, run_lengths
+
+
+# shared lowest chunk number with a marker, set in each pool worker
+_found_chunk = None
+
+
+def _init_scan_worker(found_chunk):
+    global _found_chunk
+    _found_chunk = found_chunk
+
+
+def _scan_chunk(file_name, chunk_no, start, end, window_size, block_size):
+    # process pool worker, finds the first marker whose window ends inside
+    # [start, end). scanning begins window_size - 1 bytes early so windows that
+    # straddle the chunk boundary are seen. gives up as soon as an earlier chunk
+    # has found a marker
+    scan_start = max(0, start - window_size + 1)
+    detector = MarkerDetector((window_size,))
+
+    with open(file_name, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        pos = scan_start
+
+        while pos < end:
+            if _found_chunk is not None and _found_chunk.value < chunk_no:
+                return None
+
+            block_end = min(pos + block_size, end)
+            detector.feed(data[pos:block_end])
+            pos = block_end
+
+            if detector.done:
+                if _found_chunk is not None:
+                    with _found_chunk.get_lock():
+                        _found_chunk.value = min(_found_chunk.value, chunk_no)
+
+                return scan_start + detector.markers[window_size]
+
+    return None
+
+
+def parallel_find_marker(file_name, window_size, workers=None, chunks=None, block_size=1 << 16):
+    # scan overlapping chunks of a memory mapped file in a process pool, returns
+    # the earliest marker position or None
+    file_size = os.path.getsize(file_name)
+
+    if file_size == 0:
+        return None
+
+    workers = workers or os.cpu_count() or 1
+    chunks = min(chunks or workers * 4, file_size)
+    boundaries = [file_size * chunk // chunks for chunk in range(0, chunks + 1)]
+    found_chunk = multiprocessing.Value('q', sys.maxsize)
+
+    with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_scan_worker, initargs=(found_chunk,)
+    ) as executor:
+        futures = [
+            executor.submit(_scan_chunk, file_name, chunk_no, start, end, window_size, block_size)
+            for chunk_no, (start, end) in enumerate(zip(boundaries[:-1], boundaries[1:]))
+        ]
+
+        # chunks are checked in order, the first with a marker holds the earliest one
+        for chunk_no, future in enumerate(futures):
+            marker = future.result()
+
+            if marker is not None:
+                for later_future in futures[chunk_no + 1:]:
+                    later_future.cancel()
+
+                return marker
+
+    return None
+
+
+async def detect_stream_markers(reader, window_sizes=(4, 14), read_size=65536):
+    # async generator feeding an asyncio stream into a detector, yields
+    # (window size, position) as soon as each marker is found
+    detector = MarkerDetector(window_sizes)
+
+    while not detector.done:
+        chunk = await reader.read(read_size)
+
+        if chunk == b"":
+            break
+
+        for window_size, position in sorted(detector.feed(chunk).items(), key=lambda item: item[1]):
+            yield window_size, position
+
+
+async def _handle_marker_connection(reader, writer, window_sizes):
+    # reply with a "<window size> <position>" line for each marker, the rest of
+    # the stream is discarded until the client closes its side
+    try:
+        async for window_size, position in detect_stream_markers(reader, window_sizes):
+            writer.write(f"{window_size} {position}\n".encode())
+            await writer.drain()
+
+        while await reader.read(65536) != b"":
+            pass
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def serve_markers(host="127.0.0.1", port=8006, window_sizes=(4, 14), backlog=4096):
+    # local tcp server, each connection gets its own detector
+    server = await asyncio.start_server(
+        functools.partial(_handle_marker_connection, window_sizes=window_sizes), host, port, backlog=backlog
+    )
+
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        port = int(sys.argv[2]) if len(sys.argv) > 2 else 8006
+        asyncio.run(serve_markers(port=port))
+        return
+
+    markers = find_markers("input-data/day6-input.txt", (4, 14))
+
+    print(f"Part 1: {markers[4]}")
+    print(f"Part 2: {markers[14]}")
 
 
-print(msg_start)
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import sys
+import time
+import tracemalloc
+
+from collections import deque
+
+import day7
+
+
+def build_tree(nodes, files_per_dir=8, dirs_per_dir=2):
+    # breadth first synthetic tree, each directory holds files_per_dir files and
+    # dirs_per_dir sub directories until the node count is reached
+    root = day7.VDirectory("/")
+    queue = deque([root])
+    count = 1
+
+    while count < nodes:
+        parent_dir = queue.popleft()
+
+        for file_no in range(0, files_per_dir):
+            if count >= nodes:
+                break
+
+            day7.VFile(f"file{file_no}.dat", file_no * 100, parent_dir)
+            count += 1
+
+        for dir_no in range(0, dirs_per_dir):
+            if count >= nodes:
+                break
+
+            queue.append(day7.VDirectory(f"dir{dir_no}", parent_dir))
+            count += 1
+
+    return root
+
+
+def iter_transcript(nodes, files_per_dir=8, dirs_per_dir=2):
+    # transcript of the same breadth first tree as build_tree, each directory is
+    # entered with an absolute cd and listed once
+    queue = deque(["/"])
+    count = 1
+
+    while count < nodes:
+        dir_path = queue.popleft()
+        yield f"$ cd {dir_path}"
+        yield "$ ls"
+
+        for file_no in range(0, files_per_dir):
+            if count >= nodes:
+                break
+
+            yield f"{file_no * 100} file{file_no}.dat"
+            count += 1
+
+        for dir_no in range(0, dirs_per_dir):
+            if count >= nodes:
+                break
+
+            yield f"dir dir{dir_no}"
+            queue.append(f"{dir_path.rstrip('/')}/dir{dir_no}")
+            count += 1
+
+
+def traced_bytes(snapshot, module):
+    # memory still held that was allocated from within a module
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(True, module.__file__)])
+
+    return sum(stat.size for stat in snapshot.statistics("filename"))
+
+
+def main():
+    nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 10000000
+
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    root = build_tree(nodes)
+
+    seconds = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Nodes: {nodes:,}, total size: {root.size:,}")
+    print(f"Build time: {seconds:.2f} s")
+    print(f"Memory: {current:,} bytes, {current / nodes:.1f} bytes per node")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    file_system = day7.ColumnarFileSystem()
+
+    for line in iter_transcript(nodes):
+        file_system.process_command_line(line)
+
+    seconds = time.perf_counter() - start
+    columnar_bytes = traced_bytes(tracemalloc.take_snapshot(), day7)
+    tracemalloc.stop()
+
+    if file_system.size() != root.size or file_system.node_count != nodes:
+        raise AssertionError(f"Columnar store differs: {file_system.size()} != {root.size}")
+
+    print(f"Columnar build time: {seconds:.2f} s")
+    print(f"Columnar memory: {columnar_bytes:,} bytes, {columnar_bytes / nodes:.1f} bytes per node")
+
+
+if __name__ == '__main__':
+    main()
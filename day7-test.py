@@ -1,6 +1,32 @@
 import unittest
 import day7
 
+SAMPLE_TRANSCRIPT = [
+    "$ cd /",
+    "$ ls",
+    "dir a",
+    "14848514 b.txt",
+    "8504156 c.dat",
+    "dir d",
+    "$ cd a",
+    "$ ls",
+    "dir e",
+    "29116 f",
+    "2557 g",
+    "62596 h.lst",
+    "$ cd e",
+    "$ ls",
+    "584 i",
+    "$ cd ..",
+    "$ cd ..",
+    "$ cd d",
+    "$ ls",
+    "4060174 j",
+    "8033020 d.log",
+    "5626152 d.ext",
+    "7214296 k",
+]
+
 
 class VFSErrorTestCase(unittest.TestCase):
     def test_raise(self):
@@ -73,10 +99,79 @@ class CommandLineTestCase(unittest.TestCase):
         cmd.run_command("cd ..")
         self.assertEqual(cmd.cur_dir.path, "/", msg="Test cd to parent directory")
 
-        self.assertRaises(
-            NotImplementedError,
-            lambda: cmd.run_command("cd /test/dir/subdir")
-        )
+        # multiple directory cd creates the directories that have not been seen
+        cmd.run_command("cd /test/dir/subdir")
+        self.assertEqual(cmd.cur_dir.path, "/test/dir/subdir")
+        self.assertIs(cmd.get_object("/test/dir/subdir"), cmd.cur_dir)
+
+        cmd.run_command("cd ../../other")
+        self.assertEqual(cmd.cur_dir.path, "/test/other")
+
+        cmd.run_command("cd /")
+        self.assertIs(cmd.cur_dir, cmd.file_system)
+
+        cmd.run_command("cd test/dir")
+        self.assertIs(cmd.cur_dir, cmd.get_object("/test/dir"))
+
+    def test_run_command_cd_absolute_first(self):
+        cmd = day7.CommandLine()
+
+        cmd.run_command("cd /a/b")
+        self.assertEqual(cmd.cur_dir.path, "/a/b")
+        self.assertTrue(cmd.file_system.is_root)
+
+    def test_run_command_cd_below_named_top(self):
+        cmd = day7.CommandLine()
+
+        # the first cd names the top directory, paths resolve against it
+        cmd.run_command("cd top")
+        cmd.run_command("cd a/b")
+        self.assertEqual(cmd.cur_dir.path, "top/a/b")
+        self.assertIs(cmd.get_object("top/a/b"), cmd.cur_dir)
+
+        cmd.run_command("cd ../c")
+        self.assertEqual(cmd.cur_dir.path, "top/a/c")
+
+        cmd.run_command("cd /a/b")
+        self.assertIs(cmd.cur_dir, cmd.get_object("top/a/b"))
+
+        cmd.run_command("cd /")
+        self.assertIs(cmd.cur_dir, cmd.file_system)
+
+    def test_run_command_cd_file(self):
+        cmd = day7.CommandLine()
+
+        for line in SAMPLE_TRANSCRIPT:
+            cmd.process_command_line(line)
+
+        with self.assertRaises(day7.VFSError) as cm:
+            cmd.process_command_line("$ cd /a/f")
+
+        e: day7.VFSError = cm.exception
+        self.assertEqual(e.message, "Not a directory: /a/f")
+
+    def test_path_index(self):
+        cmd = day7.CommandLine()
+
+        for line in SAMPLE_TRANSCRIPT:
+            cmd.process_command_line(line)
+
+        self.assertIs(cmd.get_object("/"), cmd.file_system)
+        self.assertEqual(cmd.get_object("/a/e/i").size, 584)
+        self.assertIsNone(cmd.get_object("/missing"))
+
+        # moving a directory re-indexes its whole subtree
+        v_dir_e = cmd.get_object("/a/e")
+        v_dir_e.parent = cmd.get_object("/d")
+        self.assertIsNone(cmd.get_object("/a/e"))
+        self.assertIsNone(cmd.get_object("/a/e/i"))
+        self.assertIs(cmd.get_object("/d/e"), v_dir_e)
+        self.assertEqual(cmd.get_object("/d/e/i").path, "/d/e/i")
+
+        # removing drops the entries
+        v_dir_e.parent = None
+        self.assertIsNone(cmd.get_object("/d/e/i"))
+        self.assertEqual(v_dir_e.path, "e")
 
     def test_run_command_ls(self):
         cmd = day7.CommandLine()
@@ -250,6 +345,20 @@ class VDirectoryTestCase(unittest.TestCase):
         v_dir5 = day7.VDirectory("subdir2", v_dir4)  # parent with no root
         self.assertEqual(v_dir5.path, "no_parent/subdir2")
 
+    def test_path_reparent(self):
+        v_dir, v_dir2, v_dir3, v_dir4 = self.common_setup()
+
+        v_file = day7.VFile("file", 0, v_dir2)
+        self.assertEqual(v_file.path, "/subdir/file")
+
+        # cached paths are cleared for the moved directory and its children
+        v_dir2.parent = v_dir3
+        self.assertEqual(v_dir2.path, "/subdir2/subdir")
+        self.assertEqual(v_file.path, "/subdir2/subdir/file")
+
+        v_dir2.parent = None
+        self.assertEqual(v_file.path, "subdir/file")
+
     def test_parent_dir(self):
         v_dir, v_dir2, v_dir3, v_dir4 = self.common_setup()
 
@@ -334,6 +443,38 @@ class VDirectoryTestCase(unittest.TestCase):
             lambda: v_dir.remove_child(v_dir4)
         )
 
+    def test_remove_child_same_name(self):
+        v_dir, v_dir2, v_dir3, v_dir4 = self.common_setup()
+
+        # a different object with the name of an existing child is not a child
+        self.assertRaises(
+            ValueError,
+            lambda: v_dir.remove_child(day7.VDirectory("subdir"))
+        )
+        self.assertEqual(v_dir.children, [v_dir2, v_dir3])
+
+    def test_has_child(self):
+        v_dir, v_dir2, v_dir3, v_dir4 = self.common_setup()
+
+        self.assertTrue(v_dir.has_child("subdir"))
+        self.assertFalse(v_dir.has_child("no_parent"))
+
+        # removed children are no longer found
+        v_dir.remove_child(v_dir2)
+        self.assertFalse(v_dir.has_child("subdir"))
+
+    def test_get_child(self):
+        v_dir, v_dir2, v_dir3, v_dir4 = self.common_setup()
+
+        self.assertIs(v_dir.get_child("subdir2"), v_dir3)
+        self.assertIsNone(v_dir.get_child("missing"))
+
+        # names can be reused once the child has moved
+        v_dir2.parent = None
+        v_dir5 = day7.VDirectory("subdir", v_dir)
+        self.assertIs(v_dir.get_child("subdir"), v_dir5)
+        self.assertEqual(v_dir.children, [v_dir3, v_dir5])
+
     def test_size(self):
         v_dir, v_dir2, v_dir3, v_dir4 = self.common_setup()
 
@@ -352,6 +493,304 @@ class VDirectoryTestCase(unittest.TestCase):
         # size with sub-dirs and files
         self.assertEqual(90, v_dir.size)
 
+    def test_size_incremental(self):
+        v_dir, v_dir2, v_dir3, v_dir4 = self.common_setup()
+
+        v_file = day7.VFile("file1", 10, v_dir2)
+        day7.VFile("file2", 20, v_dir3)
+        self.assertEqual(30, v_dir.size)
+
+        # sizes follow files that are removed or moved between directories
+        v_file.parent = v_dir3
+        self.assertEqual(0, v_dir2.size)
+        self.assertEqual(30, v_dir3.size)
+        self.assertEqual(30, v_dir.size)
+
+        v_file.parent = None
+        self.assertEqual(20, v_dir3.size)
+        self.assertEqual(20, v_dir.size)
+
+        # moving a directory moves the size of its whole subtree
+        day7.VFile("file3", 5, v_dir4)
+        v_dir4.parent = v_dir2
+        self.assertEqual(5, v_dir2.size)
+        self.assertEqual(25, v_dir.size)
+
+        v_dir2.parent = None
+        self.assertEqual(5, v_dir2.size)
+        self.assertEqual(20, v_dir.size)
+
+    def test_recalculate_size(self):
+        v_dir, v_dir2, v_dir3, v_dir4 = self.common_setup()
+
+        day7.VFile("file1", 10, v_dir2)
+
+        # a resync leaves correct sizes unchanged
+        v_dir2.recalculate_size()
+        self.assertEqual(10, v_dir2.size)
+        self.assertEqual(10, v_dir.size)
+
+        v_dir2.recalculate_size(force=True)
+        self.assertEqual(10, v_dir2.size)
+        self.assertEqual(10, v_dir.size)
+
+
+class DirectorySizesTestCase(unittest.TestCase):
+    @staticmethod
+    def common_setup():
+        cmd = day7.CommandLine()
+
+        for line in SAMPLE_TRANSCRIPT:
+            cmd.process_command_line(line)
+
+        return cmd
+
+    def test_directory_sizes(self):
+        cmd = self.common_setup()
+        table = day7.directory_sizes(cmd.file_system)
+
+        self.assertEqual(
+            [(v_dir.path, size) for v_dir, size in table],
+            [("/d", 24933642), ("/a/e", 584), ("/a", 94853), ("/", 48381165)]
+        )
+
+        # sizes match the incrementally maintained directory sizes
+        for v_dir, size in table:
+            self.assertEqual(v_dir.size, size)
+
+    def test_queries(self):
+        cmd = self.common_setup()
+        table = day7.directory_sizes(cmd.file_system)
+
+        self.assertEqual(day7.sum_directories(table, 100000), 95437)
+        self.assertEqual(day7.sum_directories(table), 73410244)
+        self.assertEqual(day7.smallest_directory(table, 8381165), 24933642)
+        self.assertIsNone(day7.smallest_directory(table, 10 ** 9))
+
+        self.assertEqual(day7.recurse_filesystem(cmd.file_system, 100000), 95437)
+        self.assertEqual(day7.find_smallest(cmd.file_system, 8381165), 24933642)
+        self.assertIsNone(day7.find_smallest(cmd.file_system, 10 ** 9))
+
+    def test_deep_tree(self):
+        # deeper than the default recursion limit
+        v_dir = day7.VDirectory("/")
+        top_dir = v_dir
+
+        for depth in range(0, 2000):
+            v_dir = day7.VDirectory(f"dir{depth}", v_dir)
+
+        day7.VFile("file", 10, v_dir)
+        table = day7.directory_sizes(top_dir)
+
+        self.assertEqual(len(table), 2001)
+        self.assertEqual(day7.sum_directories(table), 20010)
+        self.assertEqual(day7.find_smallest(top_dir, 1), 10)
+
+
+class DirectorySizeIndexTestCase(unittest.TestCase):
+    @staticmethod
+    def common_setup():
+        cmd = day7.CommandLine()
+
+        for line in SAMPLE_TRANSCRIPT:
+            cmd.process_command_line(line)
+
+        return cmd, day7.DirectorySizeIndex(cmd.file_system)
+
+    def test_queries(self):
+        cmd, index = self.common_setup()
+
+        self.assertEqual(index.smallest_at_least(8381165), 24933642)
+        self.assertEqual(index.smallest_at_least(584), 584)
+        self.assertIsNone(index.smallest_at_least(10 ** 9))
+
+        self.assertEqual(index.sum_at_most(100000), 95437)
+        self.assertEqual(index.sum_at_most(0), 0)
+
+        self.assertEqual(
+            [(v_dir.path, size) for v_dir, size in index.top_n(2)],
+            [("/", 48381165), ("/d", 24933642)]
+        )
+        self.assertEqual(len(index.top_n(10)), 4)
+
+    def test_tree_changes(self):
+        cmd, index = self.common_setup()
+        self.assertEqual(index.sum_at_most(100000), 95437)
+
+        # adding a file grows /a/e and /a past the threshold
+        day7.VFile("big", 10000, cmd.get_object("/a/e"))
+        self.assertEqual(index.sum_at_most(100000), 10584)
+
+        # removing a directory removes it from the index
+        cmd.get_object("/a/e").parent = None
+        self.assertEqual(index.sum_at_most(100000), 94269)
+        self.assertEqual(index.smallest_at_least(0), 94269)
+
+        # after closing, the index no longer follows the tree
+        index.close()
+        day7.VDirectory("new", cmd.file_system)
+        self.assertEqual(index.smallest_at_least(0), 94269)
+
+
+    def test_sub_directory(self):
+        cmd, index = self.common_setup()
+        sub_index = day7.DirectorySizeIndex(cmd.get_object("/a"))
+
+        self.assertEqual(
+            [(v_dir.path, size) for v_dir, size in sub_index.top_n(5)],
+            [("/a", 94853), ("/a/e", 584)]
+        )
+
+        # changes below /a reach an index on /a, not just one on the top
+        day7.VFile("big", 100, cmd.get_object("/a/e"))
+        day7.VDirectory("new", cmd.get_object("/a/e"))
+        self.assertEqual(sub_index.smallest_at_least(0), 0)
+        self.assertEqual(
+            [(v_dir.path, size) for v_dir, size in sub_index.top_n(5)],
+            [("/a", 94953), ("/a/e", 684), ("/a/e/new", 0)]
+        )
+
+        # changes elsewhere leave it alone
+        day7.VFile("other", 5, cmd.get_object("/d"))
+        self.assertEqual(sub_index.sum_at_most(1000), 684)
+        self.assertEqual(index.smallest_at_least(1), 684)
+
+    def test_reparented_top(self):
+        cmd, index = self.common_setup()
+
+        # the old top keeps following changes below it once moved into another tree
+        cmd.file_system.parent = day7.VDirectory("other")
+        day7.VFile("big", 100, cmd.get_object("/a/e"))
+        self.assertEqual(index.smallest_at_least(600), 684)
+
+
+class ColumnarFileSystemTestCase(unittest.TestCase):
+    @staticmethod
+    def common_setup():
+        file_system = day7.ColumnarFileSystem()
+
+        for line in SAMPLE_TRANSCRIPT:
+            file_system.process_command_line(line)
+
+        return file_system
+
+    def test_structure(self):
+        file_system = self.common_setup()
+
+        self.assertEqual(file_system.node_count, 14)
+        self.assertEqual(file_system.path(0), "/")
+        self.assertEqual(file_system.path(9), "/a/e/i")
+        self.assertEqual(file_system.name(9), "i")
+        self.assertIsNone(file_system.parent(0))
+        self.assertEqual(file_system.parent(9), 5)
+        self.assertTrue(file_system.is_dir(5))
+        self.assertFalse(file_system.is_dir(9))
+
+    def test_repeated_ls(self):
+        file_system = self.common_setup()
+
+        # listing a directory again does not add rows
+        file_system.process_command_line("$ cd ..")
+        file_system.process_command_line("$ cd a")
+        file_system.process_command_line("$ ls")
+        file_system.process_command_line("29116 f")
+        self.assertEqual(file_system.node_count, 14)
+
+    def test_sizes(self):
+        file_system = self.common_setup()
+
+        self.assertEqual(file_system.size(), 48381165)
+        self.assertEqual(file_system.size(1), 94853)
+        self.assertEqual(file_system.size(5), 584)
+
+        # sizes are recalculated once rows are added
+        file_system.process_command_line("$ ls")
+        file_system.process_command_line("100 new")
+        self.assertEqual(file_system.size(), 48381265)
+
+    def test_queries_match_object_graph(self):
+        # the sample, then transcripts returning to the root and using multi
+        # component paths
+        transcripts = [
+            SAMPLE_TRANSCRIPT,
+            ["$ cd /", "$ ls", "dir a", "$ cd a", "$ cd /", "$ ls", "10 z"],
+            SAMPLE_TRANSCRIPT + [
+                "$ cd /a/e", "$ ls", "7 j", "$ cd ../../d/new/deep", "$ ls", "30 k",
+                "$ cd ./more", "$ ls", "40 m", "$ cd /", "$ cd a", "$ ls", "50 n",
+            ],
+            ["$ cd /x/y", "$ ls", "5 f", "$ cd ../z", "$ ls", "6 g"],
+            ["$ cd top", "$ ls", "1 f", "$ cd a/b", "$ ls", "2 g", "$ cd /a", "$ ls", "3 h"],
+        ]
+
+        for transcript in transcripts:
+            file_system = day7.ColumnarFileSystem()
+            cmd = day7.CommandLine()
+
+            for line in transcript:
+                file_system.process_command_line(line)
+                cmd.process_command_line(line)
+
+            paths = [file_system.path(row) for row in range(0, file_system.node_count)]
+            self.assertEqual(len(set(paths)), len(paths))
+
+            for row, path in enumerate(paths):
+                self.assertEqual(cmd.get_object(path).name, file_system.name(row))
+
+            self.assertEqual(len(day7.directory_sizes(cmd.file_system)), len([row for row in range(0, file_system.node_count) if file_system.is_dir(row)]))
+            self.assertEqual(file_system.path(file_system.cur_dir), cmd.cur_dir.path)
+            self.assertEqual(file_system.size(), cmd.file_system.size)
+
+            for max_size in (0, 10, 100000):
+                self.assertEqual(file_system.sum_dirs(max_size), day7.recurse_filesystem(cmd.file_system, max_size))
+
+            for min_size in (0, 11, 8381165):
+                self.assertEqual(file_system.find_smallest(min_size), day7.find_smallest(cmd.file_system, min_size))
+
+            self.assertIsNone(file_system.find_smallest(10 ** 9))
+
+    def test_cd_file(self):
+        file_system = self.common_setup()
+
+        with self.assertRaises(day7.VFSError) as cm:
+            file_system.process_command_line("$ cd /a/f")
+
+        self.assertEqual(cm.exception.message, "Not a directory: /a/f")
+
+    def test_errors(self):
+        file_system = day7.ColumnarFileSystem()
+
+        self.assertRaises(
+            day7.VFSError,
+            lambda: file_system.process_command_line("14848514 b.txt")
+        )
+
+        self.assertRaises(
+            day7.VFSError,
+            lambda: file_system.process_command_line("$ unknown 1123")
+        )
+
+    def test_cd_above_top(self):
+        file_system = day7.ColumnarFileSystem()
+        file_system.process_command_line("$ cd /")
+
+        with self.assertRaises(day7.VFSError) as cm:
+            file_system.process_command_line("$ cd ..")
+
+        self.assertEqual(cm.exception.message, "Cannot cd above the top directory")
+
+        # the top directory stays row 0 with no parentless rows added
+        file_system.process_command_line("$ ls")
+        file_system.process_command_line("10 a")
+        self.assertEqual(file_system.cur_dir, 0)
+        self.assertEqual(file_system.parent(1), 0)
+
+    def test_cd_into_file(self):
+        file_system = self.common_setup()
+        file_system.process_command_line("$ cd /a")
+
+        self.assertRaises(day7.VFSError, lambda: file_system.process_command_line("$ cd f"))
+        self.assertEqual(file_system.path(file_system.cur_dir), "/a")
+
 
 if __name__ == '__main__':
     unittest.main()
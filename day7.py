@@ -1,5 +1,13 @@
+import bisect
 import re
 
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only used to speed up ColumnarFileSystem queries
+    np = None
+
 
 class VFSError(Exception):
     @property
@@ -12,6 +20,8 @@ class VFSError(Exception):
 
 
 class VFsObject:
+    __slots__ = ("_name", "_parent", "_path")
+
     @property
     def name(self):
         return self._name
@@ -26,13 +36,35 @@ class VFsObject:
 
     @property
     def path(self):
-        if self._parent is None:
-            return self._name
-        else:
-            if self._parent.is_root:
-                return f"/{self._name}"
+        # paths are cached, find the nearest ancestor with a cached path and
+        # fill in the paths below it
+        uncached = []
+        obj = self
+
+        while obj is not None and obj._path is None:
+            uncached.append(obj)
+            obj = obj._parent
+
+        for obj in reversed(uncached):
+            if obj._parent is None:
+                obj._path = obj._name
+            elif obj._parent.is_root:
+                obj._path = f"/{obj._name}"
             else:
-                return f"{self._parent.path}/{self._name}"
+                obj._path = f"{obj._parent._path}/{obj._name}"
+
+        return self._path
+
+    def _invalidate_path(self):
+        # clear the cached paths of this object and everything below it
+        objs = [self]
+
+        while objs:
+            obj = objs.pop()
+            obj._path = None
+
+            if isinstance(obj, VDirectory):
+                objs.extend(obj._children.values())
 
     def __init__(self, obj_name, parent_dir):
         if not isinstance(parent_dir, VDirectory) and parent_dir is not None:
@@ -44,6 +76,7 @@ class VFsObject:
 
         self._name = obj_name
         self._parent = None
+        self._path = None
         self._set_parent(parent_dir)
 
     def _set_parent(self, new_parent):
@@ -57,8 +90,10 @@ class VFsObject:
 
         if new_parent is None:
             self._parent = None
+            self._invalidate_path()
         else:
             self._parent = new_parent
+            self._invalidate_path()
             new_parent.add_child(self)
 
     def __repr__(self):
@@ -69,6 +104,7 @@ class VFsObject:
 
 
 class VFile(VFsObject):
+    __slots__ = ("_size",)
 
     @property
     def size(self):
@@ -87,24 +123,19 @@ class VFile(VFsObject):
 
 
 class VDirectory(VFsObject):
+    # children are held in a single name to child dict, which keeps insertion order
+    __slots__ = ("_children", "_size", "_observers")
 
     @property
     def is_root(self):
-        return self._is_root
+        return self._name == "/"
 
     @property
     def children(self):
-        return self._children
+        return list(self._children.values())
 
     @property
     def size(self):
-        if self._size is None:
-            size = 0
-            for item in self.children:
-                size += item.size
-
-            self._size = size
-
         return self._size
 
     def add_child(self, child_obj: VFsObject):
@@ -112,49 +143,76 @@ class VDirectory(VFsObject):
             raise TypeError(f"Invalid type passed to child_dir argument. "
                             f"Excepting {type(self)} got {type(child_obj)}")
 
-        for child in self._children:
-            if child.name == child_obj.name:
-                raise VFSError(f"Cannot add child with duplicate name: {child_obj.name}")
+        if child_obj.name in self._children:
+            raise VFSError(f"Cannot add child with duplicate name: {child_obj.name}")
 
-        self._children.append(child_obj)
-        self.recalculate_size()
+        self._children[child_obj.name] = child_obj
+        self._adjust_size(child_obj.size)
+        self._notify_observers(child_obj, True)
         return child_obj
 
     def remove_child(self, child_dir):
-        self._children.remove(child_dir)
-        self.recalculate_size()
+        if self._children.get(child_dir.name) is not child_dir:
+            raise ValueError(f"{child_dir.name} is not a child of {self.path}")
 
-    def has_child(self, child_name: str) -> bool:
-        for child in self._children:
-            if child.name == child_name:
-                return True
+        del self._children[child_dir.name]
+        self._adjust_size(-child_dir.size)
+        self._notify_observers(child_dir, False)
 
-        return False
+    def has_child(self, child_name: str) -> bool:
+        return child_name in self._children
 
     def get_child(self, child_name: str) -> VFsObject:
-        for child in self._children:
-            if child.name == child_name:
-                return child
+        return self._children.get(child_name)
 
-    def recalculate_size(self, force=False):
-        if self._size is None and not force:
-            return  # only reset size if not already reset
+    def add_observer(self, observer):
+        # observer(parent_dir, child_obj, added) is called whenever a child is
+        # added to or removed from this directory or any directory below it,
+        # wherever this directory sits in the tree
+        if self._observers is None:
+            self._observers = []
+
+        self._observers.append(observer)
+
+    def remove_observer(self, observer):
+        self._observers.remove(observer)
+
+    def _notify_observers(self, child_obj, added):
+        # a child of this directory changed, call the observers of this directory
+        # and every ancestor, O(depth)
+        v_dir: VDirectory = self
+
+        while v_dir is not None:
+            if v_dir._observers is not None:
+                for observer in v_dir._observers:
+                    observer(self, child_obj, added)
 
-        parent_dir: VDirectory = self.parent
-        self._size = None
+            v_dir = v_dir.parent
+
+    def _adjust_size(self, delta):
+        # sizes are kept up to date incrementally, adding or removing a child
+        # adds its size to this directory and every ancestor, O(depth)
+        parent_dir: VDirectory = self
 
         while parent_dir is not None:
-            parent_dir.recalculate_size()
+            parent_dir._size += delta
             parent_dir = parent_dir.parent
 
-    def __init__(self, dir_name, parent_dir=None):
-        self._children = []
-        self._size = None
+    def recalculate_size(self, force=False):
+        # re-sum the direct children and push any difference up to the ancestors.
+        # sizes are never left unset any more, so force has nothing extra to do
+        # and is only kept for existing callers
+        size = 0
+        for item in self._children.values():
+            size += item.size
 
-        if dir_name == "/":
-            self._is_root = True
-        else:
-            self._is_root = False
+        if size != self._size:
+            self._adjust_size(size - self._size)
+
+    def __init__(self, dir_name, parent_dir=None):
+        self._children = {}
+        self._size = 0
+        self._observers = None
 
         super(VDirectory, self).__init__(dir_name, parent_dir)
 
@@ -177,6 +235,80 @@ class CommandLine:
         self._top_dir: VDirectory = None
         self._in_cmd = False
         self._output_processor = None
+        self._path_index = {}
+
+    def get_object(self, path) -> VFsObject:
+        # look up a filesystem object by its full path, None if not found
+        return self._path_index.get(path)
+
+    def _set_top_dir(self, top_dir: VDirectory):
+        self._top_dir = top_dir
+        self._path_index = {top_dir.path: top_dir}
+        top_dir.add_observer(self._update_path_index)
+
+    def _update_path_index(self, parent_dir, child_obj, added):
+        # keep the path index in step with the tree, a moved directory takes its
+        # whole subtree with it
+        objs = [child_obj]
+
+        while objs:
+            obj = objs.pop()
+
+            if added:
+                self._path_index[obj.path] = obj
+            elif self._path_index.get(obj.path) is obj:
+                del self._path_index[obj.path]
+
+            if isinstance(obj, VDirectory):
+                objs.extend(obj.children)
+
+    def _resolve_dir(self, arg_dir) -> VDirectory:
+        # resolve a multi component or absolute path against the current
+        # directory, absolute paths start at the top directory. directories that
+        # have not been seen yet are created
+        components = []
+
+        if not arg_dir.startswith("/"):
+            v_dir = self._cur_dir
+
+            while v_dir is not self._top_dir:
+                components.append(v_dir.name)
+                v_dir = v_dir.parent
+
+            components.reverse()
+
+        for component in arg_dir.split("/"):
+            if component == "..":
+                if len(components) > 0:
+                    components.pop()
+            elif component != "" and component != ".":
+                components.append(component)
+
+        if len(components) == 0:
+            target = self._top_dir
+        elif self._top_dir.is_root:
+            target = self._path_index.get("/" + "/".join(components))
+        else:
+            target = self._path_index.get(self._top_dir.path + "/" + "/".join(components))
+
+        if target is None:
+            target = self._top_dir
+
+            for component in components:
+                child = target.get_child(component)
+
+                if child is None:
+                    child = VDirectory(component, target)
+
+                target = child
+
+                if not isinstance(target, VDirectory):
+                    break
+
+        if not isinstance(target, VDirectory):
+            raise VFSError(f"Not a directory: {target.path}")
+
+        return target
 
     def _cmd_ls_output_processor(self, output_line):
         parts = output_line.split(" ")
@@ -200,16 +332,22 @@ class CommandLine:
     def _cmd_cd(self, line):
         arg_dir = line.strip()
 
-        if arg_dir.count("/") > 1 and arg_dir != "/":
-            raise NotImplementedError("Multiple directory cd not yet supported")
-
-        # no forward slashes in path
         if self._cur_dir is None:
-            self._cur_dir = VDirectory(arg_dir)
-            self._top_dir = self._cur_dir
+            if arg_dir.startswith("/") and arg_dir != "/":
+                self._set_top_dir(VDirectory("/"))
+                self._cur_dir = self._top_dir
+            else:
+                self._cur_dir = VDirectory(arg_dir)
+                self._set_top_dir(self._cur_dir)
+                return
+
+        if "/" in arg_dir:
+            self._cur_dir = self._resolve_dir(arg_dir)
         else:
-            if self._cur_dir.has_child(arg_dir):
-                self._cur_dir = self._cur_dir.get_child(arg_dir)
+            child = self._cur_dir.get_child(arg_dir)
+
+            if child is not None:
+                self._cur_dir = child
             else:
                 if arg_dir == "..":
                     self._cur_dir = self._cur_dir.parent
@@ -251,37 +389,346 @@ class CommandLine:
                 pass
 
 
-def recurse_filesystem(search_dir: VDirectory, max_size=0):
-    child: VDirectory
+class ColumnarFileSystem:
+    """ Flat array backed alternative to the VDirectory object graph.
+
+    Every node is a row across parent index, size and is-directory columns, with
+    names stored once in an interned name table. Rows are appended as they are
+    discovered so a parent always comes before its children, which lets
+    directory sizes be totalled in a single reverse pass over the rows.
+
+    Children are chained through first child and next sibling columns. A name to
+    row lookup is only kept for the directories on the current cd path, built
+    from the chain when a directory is entered, so repeated listings do not add
+    rows without a per node dict entry.
+    """
+
+    @property
+    def node_count(self):
+        return len(self._parents)
+
+    @property
+    def cur_dir(self):
+        return self._cd_path[-1][0] if self._cd_path else None
+
+    def __init__(self):
+        self._parents = array('q')
+        self._sizes = array('q')
+        self._is_dir = bytearray()
+        self._name_ids = array('l')
+        self._first_child = array('q')
+        self._next_sibling = array('q')
+        self._names = []
+        self._name_index = {}
+        self._cd_path = []  # (row, {name id: child row}) from the top to the current directory
+        self._dir_sizes = None
+        self._in_cmd = False
+
+    @classmethod
+    def from_file(cls, file_name):
+        file_system = cls()
+
+        with open(file_name, "r") as f:
+            for line in f:
+                file_system.process_command_line(line)
+
+        return file_system
+
+    def _intern_name(self, name):
+        name_id = self._name_index.get(name)
+
+        if name_id is None:
+            name_id = len(self._names)
+            self._names.append(name)
+            self._name_index[name] = name_id
+
+        return name_id
+
+    def _append_row(self, name_id, parent, size, is_dir):
+        row = len(self._parents)
+        self._parents.append(parent)
+        self._sizes.append(size)
+        self._is_dir.append(is_dir)
+        self._name_ids.append(name_id)
+        self._first_child.append(-1)
+        self._dir_sizes = None
+
+        # new children go to the front of the parent's chain
+        if parent >= 0:
+            self._next_sibling.append(self._first_child[parent])
+            self._first_child[parent] = row
+        else:
+            self._next_sibling.append(-1)
+
+        return row
+
+    def _child_lookup(self, row):
+        # name id to row for the children of a directory
+        lookup = {}
+        child = self._first_child[row]
+
+        while child >= 0:
+            lookup[self._name_ids[child]] = child
+            child = self._next_sibling[child]
+
+        return lookup
+
+    def _add_child(self, name, size, is_dir):
+        # add a child to the current directory, an existing child is returned
+        parent, lookup = self._cd_path[-1]
+        name_id = self._intern_name(name)
+        row = lookup.get(name_id)
+
+        if row is None:
+            row = self._append_row(name_id, parent, size, is_dir)
+            lookup[name_id] = row
+
+        return row
+
+    def _enter_child(self, name):
+        row = self._add_child(name, 0, 1)
+
+        if not self.is_dir(row):
+            raise VFSError(f"Not a directory: {self.path(row)}")
+
+        self._cd_path.append((row, self._child_lookup(row)))
+
+    def name(self, row):
+        return self._names[self._name_ids[row]]
+
+    def parent(self, row):
+        parent = self._parents[row]
+        return None if parent < 0 else parent
+
+    def is_dir(self, row):
+        return self._is_dir[row] == 1
 
-    size = search_dir.size if search_dir.size <= max_size or max_size == 0 else 0
+    def path(self, row):
+        parts = []
 
-    for child in search_dir.children:
-        if isinstance(child, VDirectory):
-            size += recurse_filesystem(child, max_size)
+        while row >= 0:
+            parts.append(self.name(row))
+            row = self._parents[row]
 
-    return size
+        if len(parts) > 1 and parts[-1] == "/":
+            parts[-1] = ""
+
+        return "/".join(reversed(parts))
+
+    def process_command_line(self, line):
+        # same transcript rules as CommandLine.process_command_line
+        if line[0] == "$":
+            self._in_cmd = False
+            parts = line[1:].strip().split(" ", 1)
+
+            if parts[0] == "cd":
+                self._cd(parts[1].strip())
+            elif parts[0] == "ls":
+                if len(parts) > 1:
+                    raise NotImplementedError("ls for other directories are not currently supported")
+
+                self._in_cmd = True
+            else:
+                raise VFSError(f"Command '{parts[0]}' unknown.")
+        else:
+            if not self._in_cmd:
+                raise VFSError("Cannot process output outside a command.")
+
+            parts = line.split(" ")
+            item_name = parts[1].strip()
+
+            if parts[0] == "dir":
+                self._add_child(item_name, 0, 1)
+            else:
+                self._add_child(item_name, int(parts[0]), 0)
+
+    def _cd(self, arg_dir):
+        # same rules as CommandLine._cmd_cd, the top directory is always row 0
+        if not self._cd_path:
+            if arg_dir.startswith("/") and arg_dir != "/":
+                self._cd_path.append((self._append_row(self._intern_name("/"), -1, 0, 1), {}))
+            else:
+                self._cd_path.append((self._append_row(self._intern_name(arg_dir), -1, 0, 1), {}))
+                return
+
+        if "/" in arg_dir:
+            self._resolve_dir(arg_dir)
+        elif arg_dir == ".." and self._intern_name(arg_dir) not in self._cd_path[-1][1]:
+            if len(self._cd_path) == 1:
+                raise VFSError("Cannot cd above the top directory")
+
+            self._cd_path.pop()
+        else:
+            self._enter_child(arg_dir)
+
+    def _resolve_dir(self, arg_dir):
+        # same rules as CommandLine._resolve_dir, absolute paths start at the top
+        # directory and directories that have not been seen yet are added. the
+        # part of the cd path shared with the target keeps its lookups
+        components = [] if arg_dir.startswith("/") else [self.name(row) for row, lookup in self._cd_path[1:]]
+
+        for component in arg_dir.split("/"):
+            if component == "..":
+                if len(components) > 0:
+                    components.pop()
+            elif component != "" and component != ".":
+                components.append(component)
+
+        shared = 0
+
+        while shared < len(components) and shared + 1 < len(self._cd_path) and \
+                self.name(self._cd_path[shared + 1][0]) == components[shared]:
+            shared += 1
+
+        del self._cd_path[shared + 1:]
+
+        for component in components[shared:]:
+            self._enter_child(component)
+
+    def dir_sizes(self):
+        # total size of every row, computed with one reverse pass and cached until
+        # the next row is added. file rows hold their own size
+        if self._dir_sizes is None:
+            sizes = array('q', self._sizes)
+            parents = self._parents
+
+            for row in range(len(parents) - 1, 0, -1):
+                if parents[row] >= 0:
+                    sizes[parents[row]] += sizes[row]
+
+            self._dir_sizes = sizes
+
+        return self._dir_sizes
+
+    def size(self, row=0):
+        return self.dir_sizes()[row]
+
+    def _dir_size_column(self):
+        # sizes of the directory rows only
+        sizes = self.dir_sizes()
+
+        if np is not None:
+            return np.frombuffer(sizes, dtype=np.int64)[np.frombuffer(self._is_dir, dtype=np.uint8) == 1]
+
+        return [size for size, is_dir in zip(sizes, self._is_dir) if is_dir]
+
+    def sum_dirs(self, max_size=0):
+        # same answer as recurse_filesystem, max_size of 0 sums every directory
+        sizes = self._dir_size_column()
+
+        if np is not None:
+            return int(sizes.sum() if max_size == 0 else sizes[sizes <= max_size].sum())
+
+        return sum(size for size in sizes if size <= max_size or max_size == 0)
+
+    def find_smallest(self, min_size):
+        # same answer as find_smallest, None when no directory is large enough
+        sizes = self._dir_size_column()
+
+        if np is not None:
+            sizes = sizes[sizes >= min_size]
+            return int(sizes.min()) if len(sizes) > 0 else None
+
+        return min((size for size in sizes if size >= min_size), default=None)
+
+
+def directory_sizes(search_dir: VDirectory):
+    # iterative post-order walk summing file sizes, returns a [(directory, size)]
+    # table with every directory after all of its sub directories
+    table = []
+    sizes = {}
+    stack = [(search_dir, False)]
+
+    while stack:
+        v_dir, children_done = stack.pop()
+
+        if not children_done:
+            stack.append((v_dir, True))
+            stack.extend((child, False) for child in v_dir.children if isinstance(child, VDirectory))
+        else:
+            size = 0
+
+            for child in v_dir.children:
+                size += sizes.pop(child) if isinstance(child, VDirectory) else child.size
+
+            sizes[v_dir] = size
+            table.append((v_dir, size))
+
+    return table
+
+
+def sum_directories(table, max_size=0):
+    # total of the directory sizes at most max_size, max_size of 0 totals them all
+    return sum(size for v_dir, size in table if size <= max_size or max_size == 0)
+
+
+def smallest_directory(table, min_size):
+    # smallest directory size that is at least min_size, None if there is none
+    return min((size for v_dir, size in table if size >= min_size), default=None)
+
+
+def recurse_filesystem(search_dir: VDirectory, max_size=0):
+    return sum_directories(directory_sizes(search_dir), max_size)
 
 
 def find_smallest(search_dir: VDirectory, min_size):
-    # scenario 1: directory size is less than min_size, no further search, return None
-    if search_dir.size < min_size:
-        return None
+    return smallest_directory(directory_sizes(search_dir), min_size)
+
 
-    # scenario 2: directory is greater than or equal to min_size, search each child
-    # directory, if child is greater than min_size, search that directory
-    child: VFsObject
-    smallest = search_dir.size
+class DirectorySizeIndex:
+    """ Sorted index over every directory size below a top directory.
 
-    for child in search_dir.children:
-        if isinstance(child, VDirectory) and child.size >= min_size:
-            size = find_smallest(child, min_size)
+    Answers smallest directory at least X, sum of directories at most X and top N
+    largest with bisect and prefix sums. The index registers an observer on the
+    top directory, which sees every change below it, and is rebuilt on the next
+    query after that part of the tree changes.
+    """
 
-            if size is not None:
-                if size < smallest:
-                    smallest = size
+    def __init__(self, top_dir: VDirectory):
+        self._top_dir = top_dir
+        self._directories = None
+        self._sizes = None
+        self._prefix = None
+        top_dir.add_observer(self._invalidate)
+
+    def close(self):
+        # stop tracking changes to the tree
+        self._top_dir.remove_observer(self._invalidate)
+
+    def _invalidate(self, parent_dir, child_obj, added):
+        self._sizes = None
+
+    def _build(self):
+        if self._sizes is not None:
+            return
 
-    return smallest
+        table = sorted(directory_sizes(self._top_dir), key=lambda item: item[1])
+        self._directories = [v_dir for v_dir, size in table]
+        self._sizes = [size for v_dir, size in table]
+        self._prefix = [0]
+
+        for size in self._sizes:
+            self._prefix.append(self._prefix[-1] + size)
+
+    def smallest_at_least(self, min_size):
+        # same answer as find_smallest, None when no directory is large enough
+        self._build()
+        pos = bisect.bisect_left(self._sizes, min_size)
+
+        return self._sizes[pos] if pos < len(self._sizes) else None
+
+    def sum_at_most(self, max_size):
+        # same answer as recurse_filesystem for a max_size above 0
+        self._build()
+
+        return self._prefix[bisect.bisect_right(self._sizes, max_size)]
+
+    def top_n(self, n):
+        # the n largest directories as [(directory, size)], largest first
+        self._build()
+        start = max(len(self._sizes) - n, 0)
+
+        return list(zip(reversed(self._directories[start:]), reversed(self._sizes[start:])))
 
 
 def main():
@@ -303,10 +750,12 @@ def main():
     print(f"Space required: {target_space:,}")
     print(f"Space to free: {space_to_free:,}")
 
+    table = directory_sizes(cmd.file_system)
+
     print()
-    print(f"Part 1: {recurse_filesystem(cmd.file_system, size):,}")
+    print(f"Part 1: {sum_directories(table, size):,}")
 
-    smallest = find_smallest(cmd.file_system, space_to_free)
+    smallest = smallest_directory(table, space_to_free)
 
     print(f"Part 2: {smallest:,}")
 